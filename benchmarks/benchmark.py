@@ -0,0 +1,249 @@
+"""
+Benchmarks of ur_remote against the simulated controller, without a robot.
+
+Measure the decoding throughput of the Primary Client, the decoding cost of each ROBOT_STATE package, the round-trip
+latency of the dashboard server and the overhead of runProgram, then write the results as JSON so two runs can be
+compared before an upgrade.
+
+    python benchmarks/benchmark.py --output results.json
+    python benchmarks/benchmark.py --replay primary.log
+"""
+
+import argparse
+import contextlib
+import io
+import json
+import os
+import platform
+import statistics
+import sys
+import tempfile
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from ur_remote import Primary
+from ur_remote import PrimaryRecorder
+from ur_remote import PrimaryReplay
+from ur_remote import URRobot
+from ur_remote import SimulatedController
+from ur_remote.Dashboard import Dashboard
+from ur_remote.PrimaryEnum import MESSAGE_TYPE
+from ur_remote.PrimaryEnum import ROBOT_STATE_PACKAGE_TYPE
+from ur_remote.PrimaryEnum import PackageStruct
+
+HOST = '127.0.0.1'
+
+
+def percentile(values, fraction):
+    """
+    :param values: the measures
+    :type values: list of float
+    :param fraction: the rank of the percentile, 0.99 for the 99th percentile
+    :type fraction: float
+
+    :return: The nearest-rank percentile of the measures
+    :rtype: float
+    """
+
+    ordered = sorted(values)
+    return ordered[min(len(ordered) - 1, int(fraction * len(ordered)))]
+
+
+def summarize(durations):
+    """
+    :param durations: durations in seconds
+    :type durations: list of float
+
+    :return: count, mean, p50, p99 and max of the durations, in microseconds
+    :rtype: dict
+    """
+
+    return {
+        "count": len(durations),
+        "meanUs": statistics.mean(durations) * 1e6,
+        "p50Us": percentile(durations, 0.50) * 1e6,
+        "p99Us": percentile(durations, 0.99) * 1e6,
+        "maxUs": max(durations) * 1e6,
+    }
+
+
+def splitPackages(message):
+    """
+    :param message: a ROBOT_STATE message, header included
+    :type message: bytes
+
+    :return: Each package of the message, header included, by package type
+    :rtype: dict of bytes
+    """
+
+    packages = {}
+    offset = PackageStruct.MESSAGE_HEADER.size
+    while offset < len(message):
+        packageSize, packageType = PackageStruct.PACKAGE_HEADER.unpack_from(message, offset)
+        packages[packageType] = message[offset:offset + packageSize]
+        offset += packageSize
+    return packages
+
+
+def robotStateMessage(packages):
+    body = b''.join(packages)
+    return PackageStruct.MESSAGE_HEADER.pack(PackageStruct.MESSAGE_HEADER.size + len(body),
+                                             MESSAGE_TYPE.ROBOT_STATE) + body
+
+
+def timeDecode(primary, message, count):
+    decode = primary.decode
+    start = time.perf_counter()
+    for _ in range(count):
+        decode(message)
+    return time.perf_counter() - start
+
+
+def benchmarkDecode(messages):
+    """
+    Decode a synthetic ROBOT_STATE message holding every package, without any socket
+    """
+
+    message = SimulatedController().robotStateMessage()
+    elapsed = timeDecode(Primary(HOST), message, messages)
+    return {
+        "messages": messages,
+        "messageBytes": len(message),
+        "messagesPerSecond": messages / elapsed,
+        "megabytesPerSecond": messages * len(message) / elapsed / 1e6,
+    }
+
+
+def benchmarkPackages(messages):
+    """
+    Decode one message per package type, the cost of a package being the time above an empty message
+    """
+
+    packages = splitPackages(SimulatedController().robotStateMessage())
+    primary = Primary(HOST)
+    baseline = timeDecode(primary, robotStateMessage([]), messages) / messages
+    results = {}
+    for packageType, package in packages.items():
+        elapsed = timeDecode(primary, robotStateMessage([package]), messages) / messages
+        results[ROBOT_STATE_PACKAGE_TYPE(packageType).name] = {
+            "packageBytes": len(package),
+            "decodeUs": max(0.0, elapsed - baseline) * 1e6,
+        }
+    return {"messages": messages, "emptyMessageUs": baseline * 1e6, "packages": results}
+
+
+def benchmarkReplay(messages, path=None):
+    """
+    Replay a Primary log through the decoders, a synthetic log being recorded when none is given
+    """
+
+    log = "synthetic" if path is None else path
+    with tempfile.TemporaryDirectory() as directory:
+        if path is None:
+            path = os.path.join(directory, "primary.log")
+            message = SimulatedController().robotStateMessage()
+            with PrimaryRecorder(path) as recorder:
+                for index in range(messages):
+                    recorder.record(message, index * 0.1)
+        with PrimaryReplay(path) as replay:
+            start = time.perf_counter()
+            count = replay.replay(Primary(HOST))
+            elapsed = time.perf_counter() - start
+    return {"log": log, "messages": count, "messagesPerSecond": count / elapsed}
+
+
+def benchmarkReadPort(duration, rate):
+    """
+    Read the stream of the simulated controller through Primary.readPort, the socket included.
+    The controller is generating the messages in the same process, so this is a lower bound.
+    """
+
+    with SimulatedController(HOST, rate=rate) as controller:
+        primary = Primary(HOST, port=controller.primaryPort)
+        primary.connect()
+        count = 0
+        start = time.perf_counter()
+        while time.perf_counter() - start < duration:
+            count += primary.readPort()
+        elapsed = time.perf_counter() - start
+        primary.connection.close()
+    return {"rate": rate, "messages": count, "messagesPerSecond": count / elapsed}
+
+
+def benchmarkDashboard(commands, latency):
+    """
+    Round-trip of the "running" enquiry of the dashboard server
+    """
+
+    with SimulatedController(HOST, latency=latency) as controller:
+        dashboard = Dashboard(HOST, port=controller.dashboardPort)
+        dashboard.connect()
+        durations = []
+        for _ in range(commands):
+            start = time.perf_counter()
+            dashboard.isRunning()
+            durations.append(time.perf_counter() - start)
+        dashboard.connection.close()
+    return dict(summarize(durations), latencyUs=latency * 1e6)
+
+
+def benchmarkRunProgram(runs, programDuration, backgroundReader):
+    """
+    Time of runProgram above the duration of the program, the program being loaded and the robot running
+    """
+
+    with SimulatedController(HOST, rate=500.0, programDuration=programDuration, powerDelay=0.0) as controller:
+        robot = URRobot(HOST, backgroundReader=backgroundReader, dashboardPort=controller.dashboardPort,
+                        primaryPort=controller.primaryPort)
+        robot.runProgram("benchmark")
+        overheads = []
+        for _ in range(runs):
+            start = time.perf_counter()
+            robot.runProgram("benchmark")
+            overheads.append(time.perf_counter() - start - programDuration)
+        robot.Primary.stopReader()
+        robot.Dashboard.connection.close()
+        robot.Primary.connection.close()
+    return dict(summarize(overheads), programDurationUs=programDuration * 1e6, backgroundReader=backgroundReader)
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmarks of ur_remote against the simulated controller")
+    parser.add_argument('--messages', type=int, default=20000, help="messages decoded by each decoding benchmark")
+    parser.add_argument('--commands', type=int, default=2000, help="dashboard enquiries")
+    parser.add_argument('--runs', type=int, default=20, help="programs run by each runProgram benchmark")
+    parser.add_argument('--latency', type=float, default=0.0, help="latency of the simulated controller in seconds")
+    parser.add_argument('--duration', type=float, default=2.0, help="duration of the readPort benchmark in seconds")
+    parser.add_argument('--replay', default=None, help="Primary log replayed instead of a synthetic one")
+    parser.add_argument('--output', default=None, help="path of the JSON results, standard output by default")
+    arguments = parser.parse_args()
+
+    # The dashboard prints its answers, the results only are written to the standard output
+    with contextlib.redirect_stdout(io.StringIO()):
+        results = {
+            "environment": {
+                "python": platform.python_version(),
+                "implementation": platform.python_implementation(),
+                "platform": platform.platform(),
+                "time": time.time(),
+            },
+            "decode": benchmarkDecode(arguments.messages),
+            "packages": benchmarkPackages(arguments.messages),
+            "replay": benchmarkReplay(arguments.messages, arguments.replay),
+            "readPort": benchmarkReadPort(arguments.duration, 100000.0),
+            "dashboard": benchmarkDashboard(arguments.commands, arguments.latency),
+            "runProgramPolling": benchmarkRunProgram(arguments.runs, 0.05, False),
+            "runProgramReader": benchmarkRunProgram(arguments.runs, 0.05, True),
+        }
+
+    output = json.dumps(results, indent=2)
+    if arguments.output is None:
+        print(output)
+    else:
+        with open(arguments.output, 'w') as file:
+            file.write(output + "\n")
+
+
+if __name__ == '__main__':
+    main()
@@ -30,5 +30,10 @@ setup(
         "Operating System :: OS Independent"
     ],
     packages=["ur_remote"],
+    extras_require={
+        "numpy": ["numpy"],
+        "arrow": ["numpy", "pyarrow"],
+        "test": ["pytest"],
+    },
     include_package_data=True,
 )
\ No newline at end of file
@@ -0,0 +1,48 @@
+import time
+import pytest
+from ur_remote.Simulator import SimulatedController
+from ur_remote.URRobot import URRobot
+
+# Fast simulated controller, the tests wait for the robot a few hundred milliseconds at most
+RATE = 100.0
+POWER_DELAY = 0.05
+PROGRAM_DURATION = 0.3
+
+
+def waitUntil(condition, timeout=5.0, interval=0.01):
+    """
+    Poll a condition of the test until it holds
+
+    :return: True if the condition holds, False if the timeout expired
+    :rtype: boolean
+    """
+
+    deadline = time.monotonic() + timeout
+    while not condition():
+        if time.monotonic() >= deadline:
+            return False
+        time.sleep(interval)
+    return True
+
+
+@pytest.fixture
+def controller():
+    with SimulatedController(rate=RATE, powerDelay=POWER_DELAY, programDuration=PROGRAM_DURATION) as controller:
+        yield controller
+
+
+@pytest.fixture
+def makeRobot(controller):
+    robots = []
+
+    def makeRobot(**kwargs):
+        robot = URRobot("127.0.0.1", dashboardPort=controller.dashboardPort, primaryPort=controller.primaryPort,
+                        pollInterval=0.01, maxPollInterval=0.05, **kwargs)
+        robots.append(robot)
+        return robot
+
+    yield makeRobot
+    for robot in robots:
+        robot.Primary.stopReader()
+        robot.Primary.connection.close()
+        robot.Dashboard.connection.close()
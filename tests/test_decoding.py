@@ -0,0 +1,164 @@
+import re
+import pytest
+from ur_remote.Primary import Primary
+from ur_remote.PrimaryEnum import MESSAGE_TYPE
+from ur_remote.PrimaryEnum import PackageStruct
+from ur_remote.PrimaryEnum import ROBOT_MESSAGE_TYPE
+from ur_remote.PrimaryEnum import ROBOT_STATE_PACKAGE_TYPE
+from ur_remote.PrimaryMessage import TextMessage
+from ur_remote.PrimaryMessage import ProgramLabelMessage
+from ur_remote.PrimaryMessage import PopupMessage
+from ur_remote.PrimaryMessage import VersionMessage
+from ur_remote.PrimaryMessage import SafetyModeMessage
+from ur_remote.PrimaryMessage import ErrorCodeMessage
+from ur_remote.PrimaryMessage import KeyMessage
+from ur_remote.PrimaryMessage import RequestValueMessage
+from ur_remote.PrimaryMessage import RuntimeExceptionMessage
+from ur_remote.PrimaryState import LazyRecord
+from ur_remote.Simulator import SimulatedController
+from ur_remote.Simulator import MESSAGE_SOURCE_CONTROLLER
+
+PACKAGE_NAMES = {
+    ROBOT_STATE_PACKAGE_TYPE.ROBOT_MODE_DATA: 'robotModeData',
+    ROBOT_STATE_PACKAGE_TYPE.JOINT_DATA: 'jointData',
+    ROBOT_STATE_PACKAGE_TYPE.TOOL_DATA: 'toolData',
+    ROBOT_STATE_PACKAGE_TYPE.MASTERBOARD_DATA: 'masterboardData',
+    ROBOT_STATE_PACKAGE_TYPE.CARTESIAN_INFO: 'cartesianInfo',
+    ROBOT_STATE_PACKAGE_TYPE.KINEMATICS_INFO: 'kinematicsInfo',
+    ROBOT_STATE_PACKAGE_TYPE.CONFIGURATION_DATA: 'configurationData',
+    ROBOT_STATE_PACKAGE_TYPE.FORCE_MODE_DATA: 'forceModeData',
+    ROBOT_STATE_PACKAGE_TYPE.ADDITIONAL_INFO: 'additionalInfo',
+    ROBOT_STATE_PACKAGE_TYPE.TOOL_COMM_INFO: 'toolCommInfo',
+    ROBOT_STATE_PACKAGE_TYPE.TOOL_MODE_INFO: 'toolModeInfo',
+    ROBOT_STATE_PACKAGE_TYPE.SINGULARITY_INFO: 'singularityInfo',
+}
+
+
+def sampleValues(packer):
+    """
+    A sample value for each field of a struct, exactly representable by its format
+    """
+    values = []
+    for count, code in re.findall(r'(\d*)([a-zA-Z?])', packer.format.lstrip('!')):
+        for _ in range(int(count or 1)):
+            index = len(values) + 1
+            if code == '?':
+                values.append(index % 2 == 1)
+            elif code in 'bB':
+                values.append(index % 100)
+            elif code in 'fd':
+                values.append(index + 0.5)
+            else:
+                values.append(index * 1000)
+    return values
+
+
+def flatten(record):
+    if isinstance(record, (tuple, LazyRecord)):
+        return [value for field in record for value in flatten(field)]
+    return [record]
+
+
+def robotStateMessage(packages):
+    body = b''.join(PackageStruct.PACKAGE_HEADER.pack(PackageStruct.PACKAGE_HEADER.size + len(package), packageType) +
+                    package for packageType, package in packages)
+    return PackageStruct.MESSAGE_HEADER.pack(PackageStruct.MESSAGE_HEADER.size + len(body),
+                                             MESSAGE_TYPE.ROBOT_STATE) + body
+
+
+@pytest.mark.parametrize('lazy', [False, True])
+@pytest.mark.parametrize('packageType', list(PACKAGE_NAMES))
+def testPackageRoundTrip(packageType, lazy):
+    packer = getattr(PackageStruct, packageType.name)
+    values = sampleValues(packer)
+    expected = values
+    if packageType == ROBOT_STATE_PACKAGE_TYPE.MASTERBOARD_DATA:
+        # Without the euromap67 interface its fields keep their defaults, see testMasterboardEuromap
+        values[-1] = 0
+        expected = values + [0] * len(sampleValues(PackageStruct.MASTERBOARD_EUROMAP_DATA))
+    primary = Primary("127.0.0.1")
+    primary.subscribe(lazy=lazy)
+    primary.decode(robotStateMessage([(packageType, packer.pack(*values))]))
+
+    record = getattr(primary.getState(), PACKAGE_NAMES[packageType])
+    # Some decoders regroup the fields, like the joint limits of the configuration data, the values stay the same
+    assert sorted(map(float, flatten(record))) == sorted(map(float, expected))
+    assert primary.getSnapshot()[0] == 1
+    assert primary.decodeErrors == 0
+
+
+def testMasterboardEuromap():
+    values = sampleValues(PackageStruct.MASTERBOARD_DATA)
+    values[-1] = 1
+    euromap = sampleValues(PackageStruct.MASTERBOARD_EUROMAP_DATA)
+    primary = Primary("127.0.0.1")
+    primary.decode(robotStateMessage([(ROBOT_STATE_PACKAGE_TYPE.MASTERBOARD_DATA, PackageStruct.MASTERBOARD_DATA.pack(
+        *values) + PackageStruct.MASTERBOARD_EUROMAP_DATA.pack(*euromap))]))
+    assert list(map(float, primary.getState().masterboardData)) == list(map(float, values + euromap))
+
+
+def testSimulatedState():
+    primary = Primary("127.0.0.1")
+    primary.decode(SimulatedController().robotStateMessage())
+    state = primary.getState()
+    for name in PACKAGE_NAMES.values():
+        assert getattr(state, name) is not None, name
+    assert len(state.jointData) == 6
+
+
+def testSubscribedPackagesOnly():
+    primary = Primary("127.0.0.1")
+    primary.subscribe([ROBOT_STATE_PACKAGE_TYPE.ROBOT_MODE_DATA])
+    primary.decode(SimulatedController().robotStateMessage())
+    assert primary.getState().robotModeData is not None
+    assert primary.getState().jointData is None
+
+
+ROBOT_MESSAGES = [
+    (ROBOT_MESSAGE_TYPE.TEXT, b'hello',
+     TextMessage(1, MESSAGE_SOURCE_CONTROLLER, 'hello')),
+    (ROBOT_MESSAGE_TYPE.PROGRAM_LABEL, PackageStruct.PROGRAM_LABEL_MESSAGE.pack(12) + b'label',
+     ProgramLabelMessage(1, MESSAGE_SOURCE_CONTROLLER, 12, 'label')),
+    (ROBOT_MESSAGE_TYPE.POPUP, PackageStruct.POPUP_MESSAGE.pack(3, 1, True, False, True, 5) + b'Titlebody text',
+     PopupMessage(1, MESSAGE_SOURCE_CONTROLLER, 3, 1, True, False, True, 'Title', 'body text')),
+    (ROBOT_MESSAGE_TYPE.VERSION, PackageStruct.VERSION_NAME_SIZE.pack(9) + b'URControl' +
+     PackageStruct.VERSION_MESSAGE.pack(5, 11, 1, 108318) + b'06-07-2021',
+     VersionMessage(1, MESSAGE_SOURCE_CONTROLLER, 'URControl', 5, 11, 1, 108318, '06-07-2021')),
+    (ROBOT_MESSAGE_TYPE.SAFETY_MODE, PackageStruct.SAFETY_MODE_MESSAGE.pack(210, 3, 5, 2, 7),
+     SafetyModeMessage(1, MESSAGE_SOURCE_CONTROLLER, 210, 3, 5, 2, 7)),
+    (ROBOT_MESSAGE_TYPE.ERROR_CODE, PackageStruct.ERROR_CODE_MESSAGE.pack(150, 2, 3, 1, 9) + b'fault',
+     ErrorCodeMessage(1, MESSAGE_SOURCE_CONTROLLER, 150, 2, 3, 1, 9, 'fault')),
+    (ROBOT_MESSAGE_TYPE.KEY, PackageStruct.KEY_MESSAGE.pack(4, 8, 3) + b'Keytext',
+     KeyMessage(1, MESSAGE_SOURCE_CONTROLLER, 4, 8, 'Key', 'text')),
+    (ROBOT_MESSAGE_TYPE.REQUEST_VALUE, PackageStruct.REQUEST_VALUE_MESSAGE.pack(6, 2) + b'value?',
+     RequestValueMessage(1, MESSAGE_SOURCE_CONTROLLER, 6, 2, 'value?')),
+    (ROBOT_MESSAGE_TYPE.RUNTIME_EXCEPTION, PackageStruct.RUNTIME_EXCEPTION_MESSAGE.pack(10, 4) + b'error',
+     RuntimeExceptionMessage(1, MESSAGE_SOURCE_CONTROLLER, 10, 4, 'error')),
+]
+
+
+@pytest.mark.parametrize('robotMessageType, body, expected', ROBOT_MESSAGES,
+                         ids=[robotMessageType.name for robotMessageType, body, expected in ROBOT_MESSAGES])
+def testRobotMessageRoundTrip(robotMessageType, body, expected):
+    primary = Primary("127.0.0.1")
+    received = []
+    primary.addMessageListener(received.append)
+    primary.decode(SimulatedController.robotMessage(robotMessageType, body))
+
+    message = primary.getMessage()
+    assert message._replace(timestamp=1) == expected
+    assert received == [message]
+    assert primary.decodeErrors == 0
+
+
+def testRobotMessageTypesCovered():
+    assert {robotMessageType for robotMessageType, body, expected in ROBOT_MESSAGES} == set(ROBOT_MESSAGE_TYPE)
+
+
+@pytest.mark.parametrize('robotMessageType', [robotMessageType for robotMessageType in ROBOT_MESSAGE_TYPE
+                                              if robotMessageType != ROBOT_MESSAGE_TYPE.TEXT])
+def testShortRobotMessageSkipped(robotMessageType):
+    primary = Primary("127.0.0.1")
+    primary.decode(SimulatedController.robotMessage(robotMessageType, b'\x00'))
+    assert primary.getMessage() is None
+    assert primary.decodeErrors == 1
@@ -0,0 +1,67 @@
+import random
+import pytest
+from ur_remote.Primary import Primary
+from ur_remote.PrimaryEnum import PackageStruct
+from ur_remote.PrimaryEnum import ROBOT_MESSAGE_TYPE
+from ur_remote.PrimaryFramer import PrimaryFramer
+from ur_remote.Simulator import SimulatedController
+from conftest import waitUntil
+
+
+def streamOf(controller, count):
+    messages = []
+    for index in range(count):
+        messages.append(controller.robotStateMessage())
+        messages.append(SimulatedController.robotMessage(ROBOT_MESSAGE_TYPE.TEXT, ("text " + str(index)).encode()))
+    return messages
+
+
+@pytest.mark.parametrize('seed', range(5))
+def testRandomSplits(seed):
+    messages = streamOf(SimulatedController(), 20)
+    stream = b''.join(messages)
+    generator = random.Random(seed)
+    framer = PrimaryFramer(bufferSize=256)
+    received = []
+    start = 0
+    while start < len(stream):
+        end = min(len(stream), start + generator.randint(1, 3 * len(messages[0])))
+        framer.feed(stream[start:end])
+        received += [bytes(message) for message in framer.messages()]
+        start = end
+    assert received == messages
+    assert framer.pending() == 0
+
+
+def testByteByByte():
+    messages = streamOf(SimulatedController(), 3)
+    framer = PrimaryFramer()
+    received = []
+    for byte in b''.join(messages):
+        framer.feed(bytes([byte]))
+        received += [bytes(message) for message in framer.messages()]
+    assert received == messages
+
+
+@pytest.mark.parametrize('messageSize', [0, PackageStruct.MESSAGE_HEADER.size - 1, 2 << 20])
+def testOutOfSync(messageSize):
+    framer = PrimaryFramer()
+    framer.feed(PackageStruct.MESSAGE_HEADER.pack(messageSize, 16) + bytes(16))
+    with pytest.raises(ValueError):
+        list(framer.messages())
+    assert framer.pending() == 0
+
+
+def testChunkedWrites():
+    with SimulatedController(rate=100.0, chunkSize=7) as controller:
+        primary = Primary("127.0.0.1", port=controller.primaryPort)
+        primary.connect()
+        try:
+            primary.startReader()
+            assert waitUntil(lambda: primary.getSnapshot()[0] >= 5)
+            assert primary.getMessage(timeout=1.0).projectName == 'URControl'
+            assert primary.decodeErrors == 0
+            assert primary.getState().robotModeData is not None
+        finally:
+            primary.stopReader()
+            primary.connection.close()
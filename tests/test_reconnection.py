@@ -0,0 +1,71 @@
+import pytest
+from ur_remote.Dashboard import Dashboard
+from ur_remote.Dashboard import RobotMode
+from ur_remote.Primary import Primary
+from ur_remote.Simulator import SimulatedController
+from conftest import waitUntil
+
+
+def testDashboardReconnection(controller):
+    dashboard = Dashboard("127.0.0.1", port=controller.dashboardPort)
+    dashboard.connect()
+    try:
+        controller.disconnect()
+        # An enquiry is sent again on the restored connection
+        assert dashboard.getRobotMode() == RobotMode.POWER_OFF
+        assert dashboard.connection.getHealth()["connections"] == 2
+        controller.disconnect()
+        # A command is not sent again, its effect being unknown
+        with pytest.raises(ConnectionError):
+            dashboard.powerOnRobotArm()
+        assert "power on" not in controller.commands
+        assert dashboard.powerOnRobotArm() == "Powering on"
+        assert dashboard.connection.getHealth()["connections"] == 3
+    finally:
+        dashboard.connection.close()
+
+
+def testDashboardReconnectionAfterRestart(controller):
+    dashboard = Dashboard("127.0.0.1", port=controller.dashboardPort)
+    dashboard.connect()
+    try:
+        controller.stop()
+        with SimulatedController(dashboardPort=controller.dashboardPort, primaryPort=controller.primaryPort):
+            assert dashboard.isInRemoteControl()
+            assert dashboard.connection.getHealth()["connections"] == 2
+    finally:
+        dashboard.connection.close()
+
+
+def testPrimaryReconnection(controller):
+    primary = Primary("127.0.0.1", port=controller.primaryPort)
+    primary.connect()
+    primary.startReader()
+    try:
+        assert waitUntil(lambda: primary.getSnapshot()[0] > 0)
+        controller.disconnect()
+        assert waitUntil(lambda: primary.connection.getHealth()["connections"] == 2)
+        sequence = primary.getSnapshot()[0]
+        assert waitUntil(lambda: primary.getSnapshot()[0] > sequence)
+        assert primary.isReading()
+        assert primary.decodeErrors == 0
+    finally:
+        primary.stopReader()
+        primary.connection.close()
+
+
+def testPrimaryReconnectionAfterRestart(controller):
+    primary = Primary("127.0.0.1", port=controller.primaryPort)
+    primary.connect()
+    primary.startReader()
+    try:
+        assert waitUntil(lambda: primary.getSnapshot()[0] > 0)
+        controller.stop()
+        assert waitUntil(lambda: not primary.connection.getHealth()["connected"])
+        with SimulatedController(dashboardPort=controller.dashboardPort, primaryPort=controller.primaryPort):
+            sequence = primary.getSnapshot()[0]
+            assert waitUntil(lambda: primary.getSnapshot()[0] > sequence, timeout=15.0)
+        assert primary.isReading()
+    finally:
+        primary.stopReader()
+        primary.connection.close()
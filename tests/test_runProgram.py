@@ -0,0 +1,71 @@
+import asyncio
+import pytest
+from ur_remote.Dashboard import RobotMode
+from ur_remote.AsyncURRobot import AsyncURRobot
+
+
+@pytest.mark.parametrize('backgroundReader', [False, True])
+def testRunProgram(controller, makeRobot, backgroundReader):
+    robot = makeRobot(backgroundReader=backgroundReader)
+    robot.runProgram("prog", timeout=5.0)
+
+    assert controller.loadedProgram == "/programs/prog.urp"
+    assert controller.robotMode == RobotMode.RUNNING
+    assert "play" in controller.commands
+    assert not controller.isProgramRunning()
+
+
+@pytest.mark.parametrize('backgroundReader', [False, True])
+def testRunProgramShorterThanPoll(controller, makeRobot, backgroundReader):
+    # The program finishes before the first enquiry, it is never seen running
+    controller.programDuration = 0.0
+    robot = makeRobot(backgroundReader=backgroundReader)
+    robot.runProgram("prog", timeout=5.0)
+
+    assert "play" in controller.commands
+
+
+@pytest.mark.parametrize('backgroundReader', [False, True])
+def testRunProgramTwice(controller, makeRobot, backgroundReader):
+    robot = makeRobot(backgroundReader=backgroundReader)
+    robot.runProgram("prog", timeout=5.0)
+    robot.runProgram("prog", timeout=5.0)
+
+    assert controller.commands.count("play") == 2
+    assert controller.commands.count("load prog.urp") == 1
+
+
+def testRunProgramTimeout(controller, makeRobot):
+    controller.programDuration = 10.0
+    robot = makeRobot()
+    with pytest.raises(TimeoutError):
+        robot.runProgram("prog", timeout=0.5)
+
+
+def testRunProgramLoadFailure(controller, makeRobot):
+    controller.programDuration = 10.0
+    robot = makeRobot()
+    robot.powerOn(timeout=5.0)
+    robot.Dashboard.load("prog")
+    robot.Dashboard.play()
+    with pytest.raises(RuntimeError):
+        robot.runProgram("other", timeout=5.0)
+
+
+@pytest.mark.parametrize('backgroundReader', [False, True])
+def testAsyncRunProgram(controller, backgroundReader):
+    controller.programDuration = 0.0
+
+    async def runProgram():
+        robot = AsyncURRobot("127.0.0.1", pollInterval=0.01, dashboardPort=controller.dashboardPort,
+                             primaryPort=controller.primaryPort, backgroundReader=backgroundReader,
+                             maxPollInterval=0.05)
+        await robot.connect()
+        try:
+            await robot.runProgram("prog", timeout=5.0)
+        finally:
+            await robot.close()
+
+    asyncio.run(runProgram())
+    assert "play" in controller.commands
+    assert not controller.isProgramRunning()
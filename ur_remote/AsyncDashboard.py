@@ -0,0 +1,453 @@
+import asyncio
+from ur_remote.Dashboard import DASHBOARD_PORT
+from ur_remote.Dashboard import parseRobotMode
+from ur_remote.Connection import COMMAND_PROFILE
+
+
+class AsyncDashboard:
+    """
+    asyncio variant of the Dashboard, with the same commands as coroutines.
+    A single event loop can drive the dashboard servers of many robots at once.
+    UR robot needs to be set in remote mode on the polyscope application.
+
+    :param ipAddress: the ip address of the Universal Robot.
+    :type ipAddress: string
+    :param port: the port of the dashboard server
+    :type port: int
+    :param options: tuning of the socket and timeouts of the connection and of each feedback, see SocketOptions
+    :type options: SocketOptions
+    """
+
+    def __init__(self, ipAddress, port=DASHBOARD_PORT, options=COMMAND_PROFILE):
+        self.ipAddress = ipAddress
+        self.port = port
+        self.options = options
+        self.reader = None
+        self.writer = None
+        # Created by the first command, an asyncio.Lock built outside of a coroutine binds to the wrong event loop
+        # before Python 3.10
+        self.__lock = None
+
+    async def __sendCommand(self, command):
+        """
+        Send a command to the client, then read its feedback
+
+        :param command: command sent to the Dashboard Server
+        :type command: string
+
+        :return: The message sent by the client depending on the command
+        :rtype: string
+        """
+        message = await self.__sendCommandGet(command)
+        print(message)
+
+        return message
+
+    async def __sendCommandGet(self, command):
+        """
+        Send a command to the client, then read its feedback
+
+        :param command: command sent to the Dashboard Server
+        :type command: string
+
+        :return: The message sent by the client depending on the command
+        :rtype: string
+        """
+        async with self.__getLock():
+            self.writer.write((command + '\n').encode())
+            await self.writer.drain()
+
+            return await self.__readLine()
+
+    def __getLock(self):
+        if self.__lock is None:
+            self.__lock = asyncio.Lock()
+        return self.__lock
+
+    async def __readLine(self):
+        """
+        Read the next line sent by the client. When it times out the connection is closed, a late feedback would
+        otherwise answer the next command.
+        """
+        try:
+            line = await asyncio.wait_for(self.reader.readline(), self.options.timeout)
+        except asyncio.TimeoutError:
+            self.writer.close()
+            raise
+        if not line:
+            raise ConnectionError("Dashboard connection closed by " + self.ipAddress)
+        return line.decode().rstrip('\n')
+
+    async def batch(self, commands):
+        """
+        Send several commands in a single write, then read their feedbacks in order.
+        The whole batch costs a single round-trip to the client.
+
+        :param commands: commands sent to the Dashboard Server
+        :type commands: list of string
+
+        :return: The messages sent by the client, in the order of the commands
+        :rtype: list of string
+        """
+        async with self.__getLock():
+            self.writer.write(''.join([command + '\n' for command in commands]).encode())
+            await self.writer.drain()
+
+            return [await self.__readLine() for command in commands]
+
+    async def connect(self):
+        """
+        Connect to the Universal Robot dashboard Server
+
+        :return: The status of the connection
+        :rtype: string
+        """
+
+        self.reader, self.writer = await asyncio.wait_for(asyncio.open_connection(self.ipAddress, self.port),
+                                                          self.options.connectTimeout)
+        self.options.applyOptions(self.writer.get_extra_info('socket'))
+
+        connectionStatus = await self.__readLine()
+        print(connectionStatus)
+
+        return connectionStatus
+
+    async def close(self):
+        """
+        Close the connection without sending quit
+        """
+
+        if self.writer is not None:
+            self.writer.close()
+            await self.writer.wait_closed()
+            self.writer = None
+
+    async def load(self, programName):
+        """
+        Load a myProgram.urp file already present on the robot.
+
+        :param programName: name of the .urp program (without the .urp)
+        :type programName: string
+
+        :return: Returns when both program and associated installation has loaded (or failed). The load command fails if the associated installation requires confirmation of safety. The return value in this case will be 'Error while loading program.
+        :rtype: string
+        """
+
+        return await self.__sendCommand("load " + programName + ".urp")
+
+    async def play(self):
+        """
+        Play the program loaded
+
+        :return: Returns failure if the program fails to start.
+        :rtype: string
+        """
+
+        return await self.__sendCommand("play")
+
+    async def stop(self):
+        """
+        Stop the program loaded
+
+        :return: Returns failure if the program fails to stop.
+        :rtype: string
+        """
+
+        return await self.__sendCommand("stop")
+
+    async def pause(self):
+        """
+        Pause the program loaded
+
+        :return: Returns failure if the program fails to pause.
+        :rtype: string
+        """
+
+        return await self.__sendCommand("pause")
+
+    async def quit(self):
+        """
+        Closes connection
+
+        :return: "Disconnected"
+        :rtype: string
+        """
+
+        return await self.__sendCommand("quit")
+
+    async def shutdown(self):
+        """
+        Shuts down and turns off robot and controller.
+
+        :return: "Shutting down"
+        :rtype: string
+        """
+
+        return await self.__sendCommand("shutdown")
+
+    async def isRunning(self):
+        """
+        Execution state enquiry
+
+        :return: running state
+        :rtype: boolean
+        """
+
+        if await self.__sendCommandGet("running") == "Program running: true":
+            return True
+        else:
+            return False
+
+    async def getRobotMode(self):
+        """
+        :return: NO_CONTROLLER, DISCONNECTED, CONFIRM_SAFETY, BOOTING, POWER_OFF, POWER_ON, IDLE, BACKDRIVE, RUNNING
+        :rtype: string
+        """
+
+        return parseRobotMode(await self.__sendCommandGet("robotmode"))
+
+    async def getLoadedProgram(self):
+        """
+        :return: path to loaded program file
+        :rtype: string
+        """
+
+        message = await self.__sendCommandGet("get loaded program")
+
+        if message == "No program loaded":
+            return message
+        else:
+            return message.replace('Loaded program:', '')
+
+    async def popupDisplay(self, popupMessage):
+        """
+        Display a popup message on the Teach pendant. The popup-text will be translated to the selected language, if the text exists in the language file
+
+        :param popupMessage: Message displayed in the popup window
+        :type popupMessage: string
+
+        :return: "showing popup"
+        :rtype: string
+        """
+
+        return await self.__sendCommand("popup " + popupMessage)
+
+    async def popupClose(self):
+        """
+        close the current popup
+
+        :return: "closing popup"
+        :rtype: string
+        """
+
+        return await self.__sendCommand("close popup")
+
+    async def addToLog(self, logMessage):
+        """
+        Adds log-message to the Log history
+
+        :param logMessage: Message displayed in the popup window
+        :type logMessage: string
+
+        :return: "Added log message" Or "No log message to add"
+        :rtype: string
+        """
+
+        return await self.__sendCommand("addToLog " + logMessage)
+
+    async def isProgramSaved(self):
+        """
+        :return: save state of the active program
+        :rtype: boolean
+        """
+
+        if (await self.__sendCommandGet("isProgramSaved"))[0:4] == "true":
+            return True
+        else:
+            return False
+
+    async def getProgramState(self):
+        """
+        :return: STOPPED, PLAYING, PAUSED
+        :rtype: string
+        """
+
+        return await self.__sendCommandGet("programState")
+
+    async def getPolyscopeVersion(self):
+        """
+        :return: Version of the Polyscope software
+        :rtype: string
+        """
+
+        return await self.__sendCommandGet("PolyscopeVersion")
+
+    async def setOperationalMode(self, operationalMode):
+        """
+        Controls the operational mode. See User manual for details. Warning: This functionality is intended for using e.g. Ethernet based Key Card Readers to switch operational modes. The device for switching operational mode should be placed in vicinity to the robot.
+
+        :param operationalMode: manual or automatic
+        :type operationalMode: string
+
+        :return: operational mode status
+        :rtype: string
+        """
+
+        return await self.__sendCommand("set operational mode " + operationalMode)
+
+    async def getOperationalMode(self):
+        """
+        Returns the operational mode as MANUAL or AUTOMATIC if the password has been set for Mode in Settings. Returns NONE if the password has not been set.
+
+        :return: MANUAL, AUTOMATIC, NONE
+        :rtype: string
+        """
+
+        return await self.__sendCommandGet("get operational mode")
+
+    async def clearOperationalMode(self):
+        """
+        If this function is called the operational mode can again be changed from PolyScope, and the user password is enabled.
+
+        :return: "operational mode is no longer controlled by Dashboard Server"
+        :rtype: string
+        """
+
+        return await self.__sendCommand("clear operational mode")
+
+    async def powerOnRobotArm(self):
+        """
+        :return: "Powering on"
+        :rtype: string
+        """
+
+        return await self.__sendCommand("power on")
+
+    async def powerOffRobotArm(self):
+        """
+        :return: "Powering on"
+        :rtype: string
+        """
+
+        return await self.__sendCommand("power off")
+
+    async def brakeRelease(self):
+        """
+        :return: "Brake releasing"
+        :rtype: string
+        """
+
+        return await self.__sendCommand("brake release")
+
+    async def getSafetyStatus(self):
+        """
+        :return: NORMAL, REDUCED PROTECTIVE_STOP, RECOVERY SAFEGUARD_STOP, SYSTEM_EMERGENCY_STOP, ROBOT_EMERGENCY_STOP, VIOLATION, FAULT, AUTOMATIC_MODE_SAFEGUARD_STOP, SYSTEM_THREE_POSITION_ENABLING_STOP
+        :rtype: string
+        """
+
+        return await self.__sendCommandGet("safetystatus")
+
+    async def unlockProtectiveStop(self):
+        """
+        Closes the current popup and unlocks protective stop. The unlock protective stop command fails if less than 5 seconds has passed since the protective stop occurred.
+
+        :return: unlock status
+        :rtype: string
+        """
+
+        return await self.__sendCommand("unlock protective stop")
+
+    async def closeSafetyPopup(self):
+        """
+        :return: "closing safety popup"
+        :rtype: string
+        """
+
+        return await self.__sendCommand("close safety popup")
+
+    async def loadInstallation(self, installationName):
+        """
+        Loads the specified installation file but does not return until the load has completed (or failed).
+        The load command fails if the associated installation requires confirmation of safety.
+        The return value will be 'Failed to load installation'.
+
+        :param installationName: name of the .installation program (without the .installation)
+        :type installationName: string
+
+        :return: loading status
+        :rtype: string
+        """
+
+        return await self.__sendCommand("load " + installationName + ".installation")
+
+    async def restartSafety(self):
+        """
+        Used when robot gets a safety fault or violation to restart the safety.
+        After safety has been rebooted the robot will be in Power Off.
+        IMPORTANT: You should always ensure it is okay to restart the system.
+        It is highly recommended to check the error log before using this command (either via PolyScope or e.g. ssh connection).
+
+        :return: "Restarting status"
+        :rtype: string
+        """
+
+        return await self.__sendCommand("restart safety")
+
+    async def isInRemoteControl(self):
+        """
+        :return: remote control status
+        :rtype: boolean
+        """
+
+        if await self.__sendCommandGet("is in remote control") == "true":
+            return True
+        else:
+            return False
+
+    async def getSerialNumber(self):
+        """
+        :return: Serial number like "20175599999"
+        :rtype: string
+        """
+
+        return await self.__sendCommandGet("get serial number")
+
+    async def getRobotModel(self):
+        """
+        :return: UR3, UR5, UR10, UR16
+        :rtype: string
+        """
+
+        return await self.__sendCommandGet("get robot model")
+
+    async def generateFlightReport(self, reportType):
+        """
+        Triggers a Flight Report of the following type:
+        • Controller - report with information specific for diagnosing controller errors. For example, in case of protective stops, faults or violations.
+        • Software - report with information specific for polyscope software failures.
+        • System - report with information about robot configuration, programs, installations, etc.
+        It is required to wait at least 30 seconds between triggering software or controller reports.
+
+        :param reportType: controller, software, system
+        :type reportType: string
+
+        :return: On success report id is printed. Error Message on a failure. Command can take few minutes to complete.
+        :rtype: string
+        """
+
+        return await self.__sendCommand("generate flight report " + reportType)
+
+    async def generateSupportFile(self, directoryPath):
+        """
+        Generates a flight report of the type "System" and creates a compressed collection of all the existing flight reports on the robot along with the generated flight report.
+        Result file ur_[robot serial number]_YYYY-MM-DD_HHMM-SS.zip is saved inside <Directory path>
+
+        :param directoryPath:
+        :type directoryPath: string
+
+        :return: On success "Completed successfully: <result file name>" is printed otherwise an error message with possible cause of the error is shown.
+        Command can take up to 10 minutes to complete.
+        :rtype: string
+        """
+
+        return await self.__sendCommand("generate support file " + directoryPath)
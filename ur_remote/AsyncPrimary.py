@@ -0,0 +1,277 @@
+import asyncio
+import struct
+from ur_remote.Primary import Primary
+from ur_remote.Primary import PRIMARY_PORT
+from ur_remote.PrimaryEnum import PackageStruct
+from ur_remote.PrimaryFramer import MAX_MESSAGE_SIZE
+from ur_remote.Connection import STREAM_PROFILE
+
+
+class AsyncPrimary:
+    """
+    asyncio variant of the Primary Client, reading the messages as coroutines and decoding them with a Primary
+    which is never connected. The background thread of the Primary is replaced by a task of the event loop.
+
+    :param ipAddress: the ip address of the Universal Robot.
+    :type ipAddress: string
+    :param motionHistory: optional ring filled with the joint and cartesian samples of every ROBOT_STATE message
+    :type motionHistory: MotionHistory
+    :param port: the port of the primary client
+    :type port: int
+    :param options: tuning of the socket, a large receive buffer and a timeout detecting a silent controller by default
+    :type options: SocketOptions
+    """
+
+    def __init__(self, ipAddress, motionHistory=None, port=PRIMARY_PORT, options=STREAM_PROFILE):
+        self.ipAddress = ipAddress
+        self.port = port
+        self.options = options
+        self.decoder = Primary(ipAddress, motionHistory, options=options, port=port)
+        self.reader = None
+        self.writer = None
+        self.readerError = None
+        self.__readerTask = None
+        self.__stateChanged = None
+
+    async def connect(self):
+        """
+        Connect to the Universal Robot primary Server
+        """
+
+        self.reader, self.writer = await asyncio.wait_for(asyncio.open_connection(self.ipAddress, self.port),
+                                                          self.options.connectTimeout)
+        self.options.applyOptions(self.writer.get_extra_info('socket'))
+
+    def isConnected(self):
+        """
+        :return: True if the connection is open
+        :rtype: boolean
+        """
+
+        return self.writer is not None and not self.writer.is_closing()
+
+    async def close(self):
+        """
+        Stop the reader task and close the connection
+        """
+
+        await self.stopReader()
+        if self.writer is not None:
+            self.writer.close()
+            await self.writer.wait_closed()
+            self.writer = None
+
+    async def readMessage(self):
+        """
+        Read the next complete message of the stream.
+        When no message is completed within the timeout of the options, the controller is silent: the connection is
+        closed, as a message cut by the timeout would leave the stream out of sync, and asyncio.TimeoutError is raised.
+
+        :return: The message, header included
+        :rtype: bytes
+        """
+
+        try:
+            return await asyncio.wait_for(self.__readMessage(), self.options.timeout)
+        except asyncio.TimeoutError:
+            self.writer.close()
+            raise
+
+    async def __readMessage(self):
+        try:
+            header = await self.reader.readexactly(PackageStruct.MESSAGE_HEADER.size)
+            messageSize, messageType = PackageStruct.MESSAGE_HEADER.unpack(header)
+            if messageSize < len(header) or messageSize > MAX_MESSAGE_SIZE:
+                raise ValueError("Primary stream out of sync, invalid message size " + str(messageSize))
+            return header + await self.reader.readexactly(messageSize - len(header))
+        except asyncio.IncompleteReadError as error:
+            raise ConnectionError("Primary connection closed by " + self.ipAddress) from error
+
+    async def readPort(self):
+        """
+        Read and decode the next complete message of the stream.
+        A message out of sync or too short for its decoder is counted in the decodeErrors of the decoder, then raised.
+
+        :return: The number of messages decoded
+        :rtype: int
+        """
+
+        try:
+            self.decoder.decode(await self.readMessage())
+        except (ValueError, struct.error) as error:
+            self.decoder.decodeErrors += 1
+            self.decoder.lastDecodeError = error
+            raise
+        if self.__stateChanged is not None:
+            async with self.__stateChanged:
+                self.__stateChanged.notify_all()
+        return 1
+
+    def decode(self, message):
+        """
+        Decode a complete message of the Primary Client
+
+        :param message: the message, header included
+        :type message: bytes-like object
+        """
+
+        self.decoder.decode(message)
+
+    def subscribe(self, packageTypes=None, lazy=False):
+        """
+        Decode only some package types, see Primary.subscribe
+
+        :param packageTypes: the decoded package types, every known type by default
+        :type packageTypes: list of ROBOT_STATE_PACKAGE_TYPE
+        :param lazy: defer the decoding of each package until one of its fields is read
+        :type lazy: boolean
+        """
+
+        self.decoder.subscribe(packageTypes, lazy)
+
+    def addStateListener(self, listener):
+        """
+        Call a function with each new state, from the reader task
+
+        :param listener: function called with the new RobotState
+        :type listener: callable
+        """
+
+        self.decoder.addStateListener(listener)
+
+    def removeStateListener(self, listener):
+        """
+        :param listener: function added by addStateListener
+        :type listener: callable
+        """
+
+        self.decoder.removeStateListener(listener)
+
+    def addMessageListener(self, listener):
+        """
+        Call a function with each robot message, like a popup or a runtime exception, from the reader task
+
+        :param listener: function called with the record of the message, like PopupMessage
+        :type listener: callable
+        """
+
+        self.decoder.addMessageListener(listener)
+
+    def removeMessageListener(self, listener):
+        """
+        :param listener: function added by addMessageListener
+        :type listener: callable
+        """
+
+        self.decoder.removeMessageListener(listener)
+
+    def getState(self):
+        """
+        :return: The latest decoded package of each type
+        :rtype: RobotState
+        """
+
+        return self.decoder.getState()
+
+    def getSnapshot(self):
+        """
+        :return: The sequence number of the latest ROBOT_STATE message and the state decoded from it
+        :rtype: tuple(int, RobotState)
+        """
+
+        return self.decoder.getSnapshot()
+
+    async def waitForState(self, predicate, timeout=None):
+        """
+        Wait until a decoded state satisfies the predicate, the reader task has to be started
+
+        :param predicate: function called with each new RobotState, returning True when the state is the awaited one
+        :type predicate: callable
+        :param timeout: maximum time to wait in seconds, forever by default
+        :type timeout: float
+
+        :return: The state satisfying the predicate, None if the timeout expired
+        :rtype: RobotState
+        """
+
+        if self.__stateChanged is None:
+            self.__stateChanged = asyncio.Condition()
+        async with self.__stateChanged:
+            try:
+                await asyncio.wait_for(self.__stateChanged.wait_for(
+                    lambda: self.readerError is not None or predicate(self.decoder.getState())), timeout)
+            except asyncio.TimeoutError:
+                return None
+        if self.readerError is not None:
+            raise ConnectionError("Primary reader of " + self.ipAddress + " stopped") from self.readerError
+        return self.decoder.getState()
+
+    async def getMessage(self, timeout=0):
+        """
+        Take the oldest robot message not yet read, waiting for the reader task to decode one
+
+        :param timeout: maximum time to wait in seconds, None to wait forever, without waiting by default
+        :type timeout: float
+
+        :return: The record of the message, like PopupMessage or RuntimeExceptionMessage, None if the timeout expired
+        """
+
+        messageQueue = self.decoder.messageQueue
+        if self.__stateChanged is None:
+            self.__stateChanged = asyncio.Condition()
+        if not messageQueue and timeout != 0:
+            async with self.__stateChanged:
+                try:
+                    await asyncio.wait_for(self.__stateChanged.wait_for(
+                        lambda: self.readerError is not None or messageQueue), timeout)
+                except asyncio.TimeoutError:
+                    pass
+        if messageQueue:
+            return messageQueue.popleft()
+        if self.readerError is not None:
+            raise ConnectionError("Primary reader of " + self.ipAddress + " stopped") from self.readerError
+        return None
+
+    def startReader(self):
+        """
+        Start a task of the running event loop draining the stream and publishing the latest state
+        """
+
+        if self.isReading():
+            return
+        self.readerError = None
+        if self.__stateChanged is None:
+            self.__stateChanged = asyncio.Condition()
+        self.__readerTask = asyncio.get_running_loop().create_task(self.__read())
+
+    async def stopReader(self, timeout=None):
+        """
+        Stop the task started by startReader
+
+        :param timeout: maximum time to wait for the task in seconds, forever by default
+        :type timeout: float
+        """
+
+        if self.__readerTask is not None:
+            self.__readerTask.cancel()
+            await asyncio.wait([self.__readerTask], timeout=timeout)
+            self.__readerTask = None
+
+    def isReading(self):
+        """
+        :return: True if the reader task is draining the stream
+        :rtype: boolean
+        """
+
+        return self.__readerTask is not None and not self.__readerTask.done()
+
+    async def __read(self):
+        try:
+            while True:
+                await self.readPort()
+        except asyncio.CancelledError:
+            raise
+        except Exception as error:
+            self.readerError = error
+            async with self.__stateChanged:
+                self.__stateChanged.notify_all()
@@ -0,0 +1,207 @@
+import asyncio
+import time
+from ur_remote.Dashboard import RobotMode
+from ur_remote.Dashboard import DASHBOARD_PORT
+from ur_remote.Primary import PRIMARY_PORT
+from ur_remote.PrimaryEnum import RobotModes
+from ur_remote.URRobot import PROGRAM_START_STATES
+from ur_remote.URRobot import isProgramRunning
+from ur_remote.AsyncDashboard import AsyncDashboard
+from ur_remote.AsyncPrimary import AsyncPrimary
+
+POLL_INTERVAL = 0.1
+MAX_POLL_INTERVAL = 1.0
+
+
+class AsyncURRobot:
+    """
+    asyncio variant of the URRobot, one event loop can drive many robots at once with cheap coroutines.
+
+    UR robot needs to be set in remote mode on the polyscope application.
+
+    :param ipAddress: the ip address of the Universal Robot.
+    :type ipAddress: string
+    :param pollInterval: first time between two dashboard enquiries while waiting for the robot, in seconds
+    :type pollInterval: float
+    :param dashboardPort: the port of the dashboard server
+    :type dashboardPort: int
+    :param primaryPort: the port of the primary client
+    :type primaryPort: int
+    :param backgroundReader: start the reader task of the Primary Client when connecting, the robot is then awaited from the state it pushes instead of polling the dashboard server
+    :type backgroundReader: boolean
+    :param maxPollInterval: the time between two enquiries doubles up to this value, in seconds
+    :type maxPollInterval: float
+    """
+
+    def __init__(self, ipAddress, pollInterval=POLL_INTERVAL, dashboardPort=DASHBOARD_PORT, primaryPort=PRIMARY_PORT,
+                 backgroundReader=False, maxPollInterval=MAX_POLL_INTERVAL):
+        self.ipAddress = ipAddress
+        self.pollInterval = pollInterval
+        self.maxPollInterval = maxPollInterval
+        self.backgroundReader = backgroundReader
+        self.Dashboard = AsyncDashboard(ipAddress, dashboardPort)
+        self.Primary = AsyncPrimary(ipAddress, port=primaryPort)
+
+    async def connect(self):
+        """
+        Connect the dashboard server and the primary client at the same time, then check the remote control
+        """
+
+        await asyncio.gather(self.Dashboard.connect(), self.Primary.connect())
+        if not await self.Dashboard.isInRemoteControl():
+            raise Exception(await self.Dashboard.getRobotModel() +
+                            " is not in remote mode, switch the robot in remote control")
+        if self.backgroundReader:
+            self.Primary.startReader()
+
+    async def close(self):
+        """
+        Close the connections of the dashboard server and of the primary client
+        """
+
+        await asyncio.gather(self.Dashboard.close(), self.Primary.close())
+
+    async def powerOn(self, timeout=None):
+        """
+        Power on the robot arm and release its brakes
+
+        :param timeout: maximum time to wait for the robot to be idle and then running in seconds, forever by default
+        :type timeout: float
+        """
+
+        deadline = None if timeout is None else time.monotonic() + timeout
+        await self.Dashboard.powerOnRobotArm()
+        if not await self.waitForRobotMode(RobotMode.IDLE, self.__remaining(deadline)):
+            raise TimeoutError(self.ipAddress + " did not reach IDLE within " + str(timeout) + " s")
+        await self.Dashboard.brakeRelease()
+        if not await self.waitForRobotMode(RobotMode.RUNNING, self.__remaining(deadline)):
+            raise TimeoutError(self.ipAddress + " did not reach RUNNING within " + str(timeout) + " s")
+
+    async def waitForRobotMode(self, target, timeout=None):
+        """
+        Wait until the robot reaches a mode.
+        The robotMode pushed by the Primary Client is used when its reader task is started,
+        otherwise the dashboard server is polled with an interval backing off up to maxPollInterval.
+
+        :param target: the awaited robot mode
+        :type target: RobotMode
+        :param timeout: maximum time to wait in seconds, forever by default
+        :type timeout: float
+
+        :return: True if the robot mode has been reached, False if the timeout expired
+        :rtype: boolean
+        """
+
+        if self.Primary.isReading():
+            robotMode = RobotModes['ROBOT_MODE_' + target.name].value
+            return await self.Primary.waitForState(
+                lambda state: state.robotModeData is not None and state.robotModeData.robotMode == robotMode,
+                timeout) is not None
+
+        async def reached():
+            return await self.Dashboard.getRobotMode() == target
+
+        return await self.__poll(reached, timeout)
+
+    async def powerOff(self):
+        await self.Dashboard.powerOffRobotArm()
+
+    async def runProgram(self, programName, timeout=None):
+        """
+        Load a program, power on the robot if needed, then play the program and wait until it is finished
+
+        :param programName: name of the .urp program (without the .urp)
+        :type programName: string
+        :param timeout: maximum time to wait for the robot to power on and for the program to start and to finish in seconds, forever by default
+        :type timeout: float
+        """
+
+        deadline = None if timeout is None else time.monotonic() + timeout
+        reply = await self.Dashboard.load(programName)
+        if not reply.startswith("Loading program"):
+            raise RuntimeError(programName + " could not be loaded: " + reply)
+        if await self.Dashboard.getRobotMode() != RobotMode.RUNNING:
+            await self.powerOn(self.__remaining(deadline))
+        reply = await self.Dashboard.play()
+        if not reply.startswith("Starting program"):
+            raise RuntimeError(programName + " did not start: " + reply)
+        if self.Primary.isReading():
+            await self.__waitForProgramRun(programName, self.Primary.getSnapshot()[0], deadline, timeout)
+            return
+        await self.__pollProgramRun(programName, deadline, timeout)
+
+    async def __waitForProgramRun(self, programName, sequence, deadline, timeout):
+        """
+        Wait for the end of a program played once the state numbered sequence was decoded, like URRobot does
+        """
+        primary = self.Primary
+        state = await primary.waitForState(
+            lambda state: isProgramRunning(state) or primary.getSnapshot()[0] >= sequence + PROGRAM_START_STATES,
+            self.__remaining(deadline))
+        if state is None:
+            raise TimeoutError(programName + " did not start within " + str(timeout) + " s")
+        sequence = primary.getSnapshot()[0]
+        if isProgramRunning(state) or await self.Dashboard.isRunning():
+            if await primary.waitForState(
+                    lambda state: not isProgramRunning(state) and primary.getSnapshot()[0] > sequence,
+                    self.__remaining(deadline)) is None:
+                raise TimeoutError(programName + " did not finish within " + str(timeout) + " s")
+
+    async def __pollProgramRun(self, programName, deadline, timeout):
+        """
+        Wait for the end of a program just played by polling the dashboard server, like URRobot does
+        """
+        stopped = []
+
+        async def started():
+            if (await self.Dashboard.getProgramState()).startswith("STOPPED"):
+                stopped.append(True)
+                return len(stopped) >= PROGRAM_START_STATES
+            return True
+
+        if not await self.__poll(started, self.__remaining(deadline)):
+            raise TimeoutError(programName + " did not start within " + str(timeout) + " s")
+        if len(stopped) < PROGRAM_START_STATES and not await self.waitForProgram(False, self.__remaining(deadline)):
+            raise TimeoutError(programName + " did not finish within " + str(timeout) + " s")
+
+    async def waitForProgram(self, running, timeout=None):
+        """
+        Wait until a program is running or is not running anymore.
+        The isProgramRunning flag pushed by the Primary Client is used when its reader task is started,
+        otherwise the dashboard server is polled with an interval backing off up to maxPollInterval.
+
+        :param running: the awaited running state
+        :type running: boolean
+        :param timeout: maximum time to wait in seconds, forever by default
+        :type timeout: float
+
+        :return: True if the running state has been reached, False if the timeout expired
+        :rtype: boolean
+        """
+
+        if self.Primary.isReading():
+            return await self.Primary.waitForState(
+                lambda state: state.robotModeData is not None and state.robotModeData.isProgramRunning == running,
+                timeout) is not None
+
+        async def reached():
+            return await self.Dashboard.isRunning() == running
+
+        return await self.__poll(reached, timeout)
+
+    async def __poll(self, condition, timeout):
+        deadline = None if timeout is None else time.monotonic() + timeout
+        interval = self.pollInterval
+        while not await condition():
+            remaining = self.__remaining(deadline)
+            if remaining == 0:
+                return False
+            await asyncio.sleep(interval if remaining is None else min(interval, remaining))
+            interval = min(2 * interval, self.maxPollInterval)
+        return True
+
+    @staticmethod
+    def __remaining(deadline):
+        if deadline is None:
+            return None
+        return max(0.0, deadline - time.monotonic())
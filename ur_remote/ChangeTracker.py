@@ -0,0 +1,130 @@
+from ur_remote.PrimaryState import RobotState
+from ur_remote.PrimaryState import flattenState
+
+
+class ChangeTracker:
+    """
+    Compare each new state with the values already reported and keep only the fields which changed, so the
+    consumers receive a few fields when something happens instead of the whole state 10 times a second.
+
+    A package equal to its previous record is skipped at once, the others are compared field by field. A numeric
+    field changes when it moves further than its deadband from the value last reported, so a slow drift is
+    reported once it adds up. A deadband of float('inf') ignores a field, like the ever increasing
+    "robotModeData.timestamp". Feed it from a Primary with primary.addStateListener(tracker.update).
+
+    :param packages: names of the RobotState packages tracked, all of them by default
+    :type packages: tuple of string
+    :param deadbands: deadband of the numeric fields, by field path ("jointData.qActual.0"), by field of all the joints or vectors ("jointData.tMotor") or by package ("cartesianInfo")
+    :type deadbands: dict of float
+    """
+
+    def __init__(self, packages=RobotState._fields, deadbands=None):
+        self.packages = tuple(packages)
+        self.deadbands = dict(deadbands or {})
+        self.values = {}
+        self.listeners = []
+        self.fieldListeners = {}
+        self.__records = {}
+        self.__fieldDeadbands = {}
+
+    def update(self, state):
+        """
+        :param state: the new state
+        :type state: RobotState
+
+        :return: The fields which changed with their new value, by field path
+        :rtype: dict
+        """
+
+        changes = {}
+        values = self.values
+        for package in self.packages:
+            record = getattr(state, package)
+            previous = self.__records.get(package)
+            if record is None or record is previous or record == previous:
+                continue
+            self.__records[package] = record
+            for path, value in flattenState(state, (package,)):
+                if path not in values:
+                    changes[path] = values[path] = value
+                    continue
+                reported = values[path]
+                if value == reported:
+                    continue
+                if not isinstance(value, bool):
+                    deadband = self.__deadband(path)
+                    if deadband and abs(value - reported) <= deadband:
+                        continue
+                changes[path] = values[path] = value
+
+        if changes:
+            for listener in self.listeners:
+                listener(changes, state)
+            if self.fieldListeners:
+                for path, value in changes.items():
+                    for listener in self.fieldListeners.get(path, ()):
+                        listener(path, value)
+        return changes
+
+    def __deadband(self, path):
+        deadband = self.__fieldDeadbands.get(path)
+        if deadband is None:
+            deadband = 0.0
+            prefix = path
+            while prefix:
+                if prefix in self.deadbands:
+                    deadband = self.deadbands[prefix]
+                    break
+                prefix = prefix.rpartition('.')[0]
+            self.__fieldDeadbands[path] = deadband
+        return deadband
+
+    def addListener(self, listener):
+        """
+        Call a function with the changes of each state which changed
+
+        :param listener: function called with the changes, by field path, and the new RobotState
+        :type listener: callable
+        """
+
+        self.listeners.append(listener)
+
+    def removeListener(self, listener):
+        """
+        :param listener: function added by addListener
+        :type listener: callable
+        """
+
+        self.listeners.remove(listener)
+
+    def addFieldListener(self, path, listener):
+        """
+        Call a function each time a field changes
+
+        :param path: path of the field, like "robotModeData.isProgramRunning"
+        :type path: string
+        :param listener: function called with the path and the new value of the field
+        :type listener: callable
+        """
+
+        self.fieldListeners.setdefault(path, []).append(listener)
+
+    def removeFieldListener(self, path, listener):
+        """
+        :param path: path given to addFieldListener
+        :type path: string
+        :param listener: function added by addFieldListener
+        :type listener: callable
+        """
+
+        self.fieldListeners[path].remove(listener)
+        if not self.fieldListeners[path]:
+            del self.fieldListeners[path]
+
+    def reset(self):
+        """
+        Forget the values reported, the next state is then reported whole
+        """
+
+        self.values.clear()
+        self.__records.clear()
@@ -0,0 +1,280 @@
+import socket
+import time
+
+RETRIES = 5
+BACKOFF = 0.5
+MAX_BACKOFF = 10.0
+
+
+class SocketOptions:
+    """
+    Tuning of the socket of a Connection, applied on each connection.
+
+    :param timeout: timeout of the blocking operations in seconds, None to block forever
+    :type timeout: float
+    :param connectTimeout: timeout of the connection in seconds, None to wait for the system
+    :type connectTimeout: float
+    :param noDelay: disable the Nagle algorithm (TCP_NODELAY), small writes are then sent at once
+    :type noDelay: boolean
+    :param receiveBuffer: size of the receive buffer of the system (SO_RCVBUF) in bytes, None for the system default
+    :type receiveBuffer: int
+    :param keepAlive: enable the TCP keepalive probes (SO_KEEPALIVE) to detect a dead peer on an idle connection
+    :type keepAlive: boolean
+    :param keepAliveIdle: idle time before the first probe in seconds, where the platform supports it
+    :type keepAliveIdle: int
+    :param keepAliveInterval: time between two probes in seconds, where the platform supports it
+    :type keepAliveInterval: int
+    :param keepAliveCount: number of unanswered probes before the connection is dropped, where the platform supports it
+    :type keepAliveCount: int
+    """
+
+    def __init__(self, timeout=None, connectTimeout=None, noDelay=False, receiveBuffer=None, keepAlive=False,
+                 keepAliveIdle=None, keepAliveInterval=None, keepAliveCount=None):
+        self.timeout = timeout
+        self.connectTimeout = connectTimeout
+        self.noDelay = noDelay
+        self.receiveBuffer = receiveBuffer
+        self.keepAlive = keepAlive
+        self.keepAliveIdle = keepAliveIdle
+        self.keepAliveInterval = keepAliveInterval
+        self.keepAliveCount = keepAliveCount
+
+    def apply(self, server):
+        """
+        Set the options on a socket not yet connected, its timeout being the connection timeout
+
+        :param server: the socket
+        :type server: socket.socket
+        """
+
+        server.settimeout(self.connectTimeout)
+        self.applyOptions(server)
+
+    def applyOptions(self, server):
+        """
+        Set the options other than the timeouts on a socket, like the socket of an asyncio stream whose timeouts are
+        enforced by the coroutines reading it
+
+        :param server: the socket
+        :type server: socket.socket
+        """
+
+        if self.noDelay:
+            server.setsockopt(socket.IPPROTO_TCP, socket.TCP_NODELAY, 1)
+        if self.receiveBuffer is not None:
+            server.setsockopt(socket.SOL_SOCKET, socket.SO_RCVBUF, self.receiveBuffer)
+        if self.keepAlive:
+            server.setsockopt(socket.SOL_SOCKET, socket.SO_KEEPALIVE, 1)
+            for option, value in (('TCP_KEEPIDLE', self.keepAliveIdle), ('TCP_KEEPINTVL', self.keepAliveInterval),
+                                  ('TCP_KEEPCNT', self.keepAliveCount)):
+                if value is not None and hasattr(socket, option):
+                    server.setsockopt(socket.IPPROTO_TCP, getattr(socket, option), value)
+
+
+# Small request/response writes of the dashboard server, sent without delay and never blocking forever
+COMMAND_PROFILE = SocketOptions(timeout=30.0, connectTimeout=5.0, noDelay=True, keepAlive=True,
+                                keepAliveIdle=10, keepAliveInterval=5, keepAliveCount=3)
+# Continuous stream of the primary client, a large receive buffer absorbs the bursts while the reader is busy
+STREAM_PROFILE = SocketOptions(timeout=5.0, connectTimeout=5.0, receiveBuffer=1 << 20, keepAlive=True,
+                               keepAliveIdle=10, keepAliveInterval=5, keepAliveCount=3)
+
+
+class Connection:
+    """
+    Managed TCP/IP connection to a server of a Universal Robot, reconnected with backoff after a disconnection.
+
+    The socket is recreated on each connection, so the object survives a quit, a controller restart or a network
+    blip. The onConnect callback restores the state of the channel after each connection, like reading the greeting
+    banner of the dashboard server.
+
+    :param ipAddress: the ip address of the Universal Robot.
+    :type ipAddress: string
+    :param port: the port of the server
+    :type port: int
+    :param onConnect: function called without argument after each connection, its result is returned by connect
+    :type onConnect: callable
+    :param retries: number of attempts of a reconnection before giving up, None to retry forever
+    :type retries: int
+    :param backoff: time before the second attempt in seconds, doubled after each failed attempt
+    :type backoff: float
+    :param maxBackoff: maximum time between two attempts in seconds
+    :type maxBackoff: float
+    :param options: tuning of the socket, blocking without timeout by default
+    :type options: SocketOptions
+    """
+
+    def __init__(self, ipAddress, port, onConnect=None, retries=RETRIES, backoff=BACKOFF, maxBackoff=MAX_BACKOFF,
+                 options=None):
+        self.ipAddress = ipAddress
+        self.port = port
+        self.onConnect = onConnect
+        self.retries = retries
+        self.backoff = backoff
+        self.maxBackoff = maxBackoff
+        self.options = options if options is not None else SocketOptions()
+        self.server = None
+        self.timeout = self.options.timeout
+        self.connected = False
+        self.connections = 0
+        self.disconnections = 0
+        self.connectedSince = None
+        self.lastError = None
+
+    def connect(self):
+        """
+        Open a new connection to the server, closing the previous one
+
+        :return: The result of the onConnect callback
+        """
+
+        self.close()
+        self.server = socket.socket(socket.AF_INET, socket.SOCK_STREAM)
+        try:
+            self.options.apply(self.server)
+            self.server.connect((self.ipAddress, self.port))
+        except OSError as error:
+            self.__lost(error)
+            raise
+        self.server.settimeout(self.timeout)
+        self.connected = True
+        self.connections += 1
+        self.connectedSince = time.time()
+
+        if self.onConnect is not None:
+            return self.onConnect()
+
+    def reconnect(self):
+        """
+        Connect to the server, retrying with backoff
+
+        :return: The result of the onConnect callback
+        """
+
+        attempt = 0
+        backoff = self.backoff
+        while True:
+            try:
+                return self.connect()
+            except OSError as error:
+                attempt += 1
+                if self.retries is not None and attempt >= self.retries:
+                    raise ConnectionError("Failed to reconnect to " + self.ipAddress + ":" + str(self.port) +
+                                          " after " + str(attempt) + " attempts") from error
+            time.sleep(backoff)
+            backoff = min(2 * backoff, self.maxBackoff)
+
+    def ensureConnected(self):
+        """
+        Reconnect if the connection has been lost or closed
+        """
+
+        if not self.connected:
+            self.reconnect()
+
+    def close(self):
+        """
+        Close the connection, it is reopened by the next reconnect
+        """
+
+        self.connected = False
+        if self.server is not None:
+            self.server.close()
+            self.server = None
+
+    def isConnected(self):
+        """
+        :return: True if the connection is open and has not failed
+        :rtype: boolean
+        """
+
+        return self.connected
+
+    def getHealth(self):
+        """
+        :return: connected, connections, disconnections, connectedSince (epoch time) and lastError
+        :rtype: dict
+        """
+
+        return {
+            "connected": self.connected,
+            "connections": self.connections,
+            "disconnections": self.disconnections,
+            "connectedSince": self.connectedSince,
+            "lastError": self.lastError,
+        }
+
+    def settimeout(self, timeout):
+        """
+        :param timeout: timeout of the blocking operations of this socket and of the next ones, None to block forever
+        :type timeout: float
+        """
+
+        self.timeout = timeout
+        if self.server is not None:
+            self.server.settimeout(timeout)
+
+    def sendall(self, data):
+        server = self.__socket()
+        try:
+            server.sendall(data)
+        except (socket.timeout, BlockingIOError):
+            raise
+        except OSError as error:
+            self.__lost(error)
+            raise ConnectionError("Connection to " + self.ipAddress + ":" + str(self.port) + " lost") from error
+
+    def send(self, data):
+        """
+        Send as much data as the socket accepts, for a non-blocking socket
+
+        :return: The number of bytes sent
+        :rtype: int
+        """
+
+        server = self.__socket()
+        try:
+            return server.send(data)
+        except (socket.timeout, BlockingIOError):
+            raise
+        except OSError as error:
+            self.__lost(error)
+            raise ConnectionError("Connection to " + self.ipAddress + ":" + str(self.port) + " lost") from error
+
+    def recv(self, size):
+        server = self.__socket()
+        try:
+            data = server.recv(size)
+        except (socket.timeout, BlockingIOError):
+            raise
+        except OSError as error:
+            self.__lost(error)
+            raise ConnectionError("Connection to " + self.ipAddress + ":" + str(self.port) + " lost") from error
+        if not data:
+            self.__lost(None)
+            raise ConnectionError("Connection closed by " + self.ipAddress + ":" + str(self.port))
+        return data
+
+    def recv_into(self, buffer):
+        server = self.__socket()
+        try:
+            received = server.recv_into(buffer)
+        except (socket.timeout, BlockingIOError):
+            raise
+        except OSError as error:
+            self.__lost(error)
+            raise ConnectionError("Connection to " + self.ipAddress + ":" + str(self.port) + " lost") from error
+        if not received:
+            self.__lost(None)
+            raise ConnectionError("Connection closed by " + self.ipAddress + ":" + str(self.port))
+        return received
+
+    def __socket(self):
+        if not self.connected:
+            raise ConnectionError("Not connected to " + self.ipAddress + ":" + str(self.port))
+        return self.server
+
+    def __lost(self, error):
+        if self.connected:
+            self.disconnections += 1
+        self.connected = False
+        self.lastError = error
@@ -1,7 +1,12 @@
 import socket
+import time
 from enum import Enum
+from ur_remote.Connection import Connection
+from ur_remote.Connection import COMMAND_PROFILE
+from ur_remote.Metrics import DASHBOARD_ROUND_TRIP
 
 DASHBOARD_PORT = 29999
+REPORT_TIMEOUT = 900.0
 
 
 class RobotMode(Enum):
@@ -16,6 +21,38 @@ class RobotMode(Enum):
     RUNNING = 9
 
 
+def parseRobotMode(message):
+    """
+    Convert the answer of the robotmode command
+
+    :param message: answer of the dashboard server, like "Robotmode: RUNNING"
+    :type message: string
+
+    :return: The robot mode, None if unknown
+    :rtype: RobotMode
+    """
+
+    robotMode = message.replace('Robotmode: ', '')
+    if robotMode == "NO_CONTROLLER":
+        return RobotMode.NO_CONTROLLER
+    if robotMode == "DISCONNECTED":
+        return RobotMode.DISCONNECTED
+    if robotMode == "CONFIRM_SAFETY":
+        return RobotMode.CONFIRM_SAFETY
+    if robotMode == "BOOTING":
+        return RobotMode.BOOTING
+    if robotMode == "POWER_OFF":
+        return RobotMode.POWER_OFF
+    if robotMode == "POWER_ON":
+        return RobotMode.POWER_ON
+    if robotMode == "IDLE":
+        return RobotMode.IDLE
+    if robotMode == "BACKDRIVE":
+        return RobotMode.BACKDRIVE
+    if robotMode == "RUNNING":
+        return RobotMode.RUNNING
+
+
 class Dashboard:
     """
     Create a communication using TCP/IP with the dashboard server interface of a Universal Robot e-series.
@@ -24,32 +61,114 @@ class Dashboard:
 
     :param ipAddress: the ip address of the Universal Robot.
     :type ipAddress: string
+    :param options: tuning of the socket, low latency and a timeout on every command by default
+    :type options: SocketOptions
+    :param port: the port of the dashboard server
+    :type port: int
+    :param metrics: optional callback measuring the round-trip of each command, see MetricsCollector
+    :type metrics: callable
     """
 
-    def __init__(self, ipAddress):
+    def __init__(self, ipAddress, options=COMMAND_PROFILE, port=DASHBOARD_PORT, metrics=None):
         self.ipAddress = ipAddress
-        self.server = socket.socket(socket.AF_INET, socket.SOCK_STREAM)
+        self.port = port
+        self.metrics = metrics
+        self.connection = Connection(ipAddress, port, onConnect=self.__readGreeting, options=options)
+        self.buffer = bytearray()
+        self.greeting = None
+
+    def __readGreeting(self):
+        self.buffer.clear()
+        self.greeting = self.__readLine()
+        print(self.greeting)
 
-    def __sendCommand(self, command):
+        return self.greeting
+
+    def __readLine(self):
+        """
+        Read the next line sent by the client, the bytes received after it are kept for the next lines
+
+        :return: The line without its newline
+        :rtype: string
         """
-        Send a command to the client, then read its feedback
+        while True:
+            end = self.buffer.find(b'\n')
+            if end >= 0:
+                line = self.buffer[:end].decode()
+                del self.buffer[:end + 1]
+                return line
+
+            self.buffer += self.connection.recv(4096)
+
+    def __exchange(self, commands, timeout=None, label=None):
+        """
+        Send commands in a single write, reconnecting first if the connection has been lost, then read their feedbacks.
+        When a feedback times out the connection is closed, a late feedback would otherwise answer the next command.
+
+        :param commands: commands sent to the Dashboard Server
+        :type commands: list of string
+        :param timeout: timeout of these commands in seconds, the timeout of the socket options by default
+        :type timeout: float
+        :param label: label of the round-trip in the metrics, the command itself or "batch" by default
+        :type label: string
+
+        :return: The messages sent by the client, in the order of the commands
+        :rtype: list of string
+        """
+        self.connection.ensureConnected()
+        defaultTimeout = self.connection.timeout
+        if timeout is not None:
+            self.connection.settimeout(timeout)
+        metrics = self.metrics
+        try:
+            if metrics is None:
+                self.connection.sendall(''.join([command + '\n' for command in commands]).encode())
+
+                return [self.__readLine() for command in commands]
+
+            start = time.perf_counter()
+            self.connection.sendall(''.join([command + '\n' for command in commands]).encode())
+            messages = [self.__readLine() for command in commands]
+            if label is None:
+                label = commands[0] if len(commands) == 1 else "batch"
+            metrics(DASHBOARD_ROUND_TRIP, label, time.perf_counter() - start)
+
+            return messages
+        except socket.timeout:
+            self.connection.close()
+            raise
+        finally:
+            if timeout is not None:
+                self.connection.settimeout(defaultTimeout)
+
+    def __sendCommand(self, command, timeout=None, label=None):
+        """
+        Send a command to the client, then read its feedback.
+        When the connection is lost, it is restored but the command is not sent again, its effect being unknown.
 
         :param command: command sent to the Dashboard Server
         :type command: string
+        :param timeout: timeout of this command in seconds, the timeout of the socket options by default
+        :type timeout: float
+        :param label: label of the round-trip in the metrics, given for the commands with an argument
+        :type label: string
 
         :return: The message sent by the client depending on the command
         :rtype: string
         """
-        self.server.sendall((command + '\n').encode())
-
-        message = self.server.recv(4096).decode().rstrip('\n')
+        try:
+            message = self.__exchange([command], timeout, label)[0]
+        except ConnectionError:
+            self.connection.reconnect()
+            raise
         print(message)
 
         return message
 
     def __sendCommandGet(self, command):
         """
-        Send a command to the client, then read its feedback
+        Send a command to the client, then read its feedback.
+        When the connection is lost, it is restored and the enquiry is sent again.
 
         :param command: command sent to the Dashboard Server
         :type command: string
@@ -57,9 +176,51 @@ class Dashboard:
         :return: The message sent by the client depending on the command
         :rtype: string
         """
-        self.server.sendall((command + '\n').encode())
+        return self.__sendCommandsGet([command])[0]
+
+    def __sendCommandsGet(self, commands):
+        try:
+            return self.__exchange(commands)
+        except ConnectionError:
+            self.connection.reconnect()
+            return self.__exchange(commands)
 
-        return self.server.recv(4096).decode().rstrip('\n')
+    def batch(self, commands):
+        """
+        Send several commands in a single write, then read their feedbacks in order.
+        The whole batch costs a single round-trip to the client.
+
+        :param commands: commands sent to the Dashboard Server
+        :type commands: list of string
+
+        :return: The messages sent by the client, in the order of the commands
+        :rtype: list of string
+        """
+        try:
+            return self.__exchange(commands)
+        except ConnectionError:
+            self.connection.reconnect()
+            raise
+
+    def getStatus(self):
+        """
+        Enquire the robot mode, the program state, the safety status, the running state and the loaded program
+        in a single round-trip
+
+        :return: robotMode, programState, safetyStatus, running and loadedProgram
+        :rtype: dict
+        """
+
+        robotMode, programState, safetyStatus, running, loadedProgram = self.__sendCommandsGet(
+            ["robotmode", "programState", "safetystatus", "running", "get loaded program"])
+
+        return {
+            "robotMode": parseRobotMode(robotMode),
+            "programState": programState,
+            "safetyStatus": safetyStatus,
+            "running": running == "Program running: true",
+            "loadedProgram": loadedProgram.replace('Loaded program:', ''),
+        }
 
     def connect(self):
         """
@@ -69,12 +230,15 @@ class Dashboard:
         :rtype: string
         """
 
-        self.server.connect((self.ipAddress, DASHBOARD_PORT))
+        return self.connection.connect()
 
-        connectionStatus = self.server.recv(1024).decode().rstrip('\n')
-        print(connectionStatus)
+    def isConnected(self):
+        """
+        :return: True if the connection is open, it is otherwise reopened by the next command
+        :rtype: boolean
+        """
 
-        return connectionStatus
+        return self.connection.isConnected()
 
     def load(self, programName):
         """
@@ -87,7 +251,7 @@ class Dashboard:
         :rtype: string
         """
 
-        return self.__sendCommand("load " + programName + ".urp")
+        return self.__sendCommand("load " + programName + ".urp", label="load")
 
     def play(self):
         """
@@ -127,7 +291,10 @@ class Dashboard:
         :rtype: string
         """
 
-        return self.__sendCommand("quit")
+        message = self.__sendCommand("quit")
+        self.connection.close()
+
+        return message
 
     def shutdown(self):
         """
@@ -158,27 +325,7 @@ class Dashboard:
         :rtype: string
         """
 
-        def switch(robotMode):
-            if robotMode == "NO_CONTROLLER":
-                return RobotMode.NO_CONTROLLER
-            if robotMode == "DISCONNECTED":
-                return RobotMode.DISCONNECTED
-            if robotMode == "CONFIRM_SAFETY":
-                return RobotMode.CONFIRM_SAFETY
-            if robotMode == "BOOTING":
-                return RobotMode.BOOTING
-            if robotMode == "POWER_OFF":
-                return RobotMode.POWER_OFF
-            if robotMode == "POWER_ON":
-                return RobotMode.POWER_ON
-            if robotMode == "IDLE":
-                return RobotMode.IDLE
-            if robotMode == "BACKDRIVE":
-                return RobotMode.BACKDRIVE
-            if robotMode == "RUNNING":
-                return RobotMode.RUNNING
-
-        return switch(self.__sendCommandGet("robotmode").replace('Robotmode: ', ''))
+        return parseRobotMode(self.__sendCommandGet("robotmode"))
 
     def getLoadedProgram(self):
         """
@@ -204,7 +351,7 @@ class Dashboard:
         :rtype: string
         """
 
-        return self.__sendCommand("popup " + popupMessage)
+        return self.__sendCommand("popup " + popupMessage, label="popup")
 
     def popupClose(self):
         """
@@ -227,7 +374,7 @@ class Dashboard:
         :rtype: string
         """
 
-        return self.__sendCommand("addToLog " + logMessage)
+        return self.__sendCommand("addToLog " + logMessage, label="addToLog")
 
     def isProgramSaved(self):
         """
@@ -267,7 +414,7 @@ class Dashboard:
         :rtype: string
         """
 
-        return self.__sendCommand("set operational mode " + operationalMode)
+        return self.__sendCommand("set operational mode " + operationalMode, label="set operational mode")
 
     def getOperationalMode(self):
         """
@@ -345,14 +492,14 @@ class Dashboard:
         The load command fails if the associated installation requires confirmation of safety.
         The return value will be 'Failed to load installation'.
 
-        :param installationNameName: name of the .installation program (without the .installation)
-        :type installationNameName: string
+        :param installationName: name of the .installation program (without the .installation)
+        :type installationName: string
 
         :return: loading status
         :rtype: string
         """
 
-        return self.__sendCommand("load " + installationNameName + ".installation\n")
+        return self.__sendCommand("load " + installationName + ".installation", label="load installation")
 
     def restartSafety(self):
         """
@@ -409,7 +556,7 @@ class Dashboard:
         :rtype: string
         """
 
-        return self.__sendCommand("generate flight report " + reportType)
+        return self.__sendCommand("generate flight report " + reportType, REPORT_TIMEOUT, "generate flight report")
 
     def generateSupportFile(self, directoryPath):
         """
@@ -424,4 +571,4 @@ class Dashboard:
         :rtype: string
         """
 
-        return self.__sendCommand("generate support file " + directoryPath)
+        return self.__sendCommand("generate support file " + directoryPath, REPORT_TIMEOUT, "generate support file")
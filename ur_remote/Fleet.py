@@ -0,0 +1,185 @@
+import threading
+from concurrent.futures import ThreadPoolExecutor
+
+
+class Step:
+    """
+    A program run on a robot of a Fleet, started once the steps it depends on are finished.
+
+    :param robotName: name of the robot in the fleet
+    :type robotName: string
+    :param programName: name of the .urp program (without the .urp)
+    :type programName: string
+    :param after: steps, of any robot, which have to be finished before this one starts
+    :type after: list of Step
+    :param timeout: maximum time given to the program in seconds, forever by default
+    :type timeout: float
+    """
+
+    def __init__(self, robotName, programName, after=None, timeout=None):
+        self.robotName = robotName
+        self.programName = programName
+        self.after = list(after or [])
+        self.timeout = timeout
+        self.error = None
+        self.finished = threading.Event()
+
+    def __repr__(self):
+        return "Step(" + self.robotName + ", " + self.programName + ")"
+
+
+class Fleet:
+    """
+    Drive several URRobot at the same time, one thread per robot.
+
+    Each robot runs its own steps in the order they have been added, while a step can wait for steps of other
+    robots. The cycle time of the cell is then set by its critical path instead of the sum of all the steps.
+
+    :param robots: the robots of the fleet by name
+    :type robots: dict of URRobot
+    """
+
+    def __init__(self, robots=None):
+        self.robots = dict(robots or {})
+        self.steps = []
+
+    def addRobot(self, robotName, robot):
+        """
+        :param robotName: name of the robot in the fleet
+        :type robotName: string
+        :param robot: the robot
+        :type robot: URRobot
+        """
+
+        self.robots[robotName] = robot
+
+    def connectAll(self):
+        """
+        Connect every robot at the same time, the robots being created with lazy=True
+
+        :return: The connection errors by robot name, empty when every robot is connected
+        :rtype: dict
+        """
+
+        errors = {}
+        if not self.robots:
+            return errors
+        with ThreadPoolExecutor(max_workers=len(self.robots)) as executor:
+            connections = {robotName: executor.submit(robot.connect) for robotName, robot in self.robots.items()}
+        for robotName, connection in connections.items():
+            if connection.exception() is not None:
+                errors[robotName] = connection.exception()
+        return errors
+
+    def addStep(self, robotName, programName, after=None, timeout=None):
+        """
+        Add a program at the end of the steps of a robot
+
+        :param robotName: name of the robot in the fleet
+        :type robotName: string
+        :param programName: name of the .urp program (without the .urp)
+        :type programName: string
+        :param after: steps, of any robot, which have to be finished before this one starts
+        :type after: list of Step
+        :param timeout: maximum time given to the program in seconds, forever by default
+        :type timeout: float
+
+        :return: The step, to be used as a dependency of other steps
+        :rtype: Step
+        """
+
+        if robotName not in self.robots:
+            raise KeyError(robotName + " is not a robot of the fleet")
+        step = Step(robotName, programName, after, timeout)
+        self.steps.append(step)
+        return step
+
+    def addSequence(self, robotName, programNames, after=None, timeout=None):
+        """
+        Add several programs at the end of the steps of a robot, the first one waiting for the given steps
+
+        :param robotName: name of the robot in the fleet
+        :type robotName: string
+        :param programNames: names of the .urp programs (without the .urp)
+        :type programNames: list of string
+        :param after: steps, of any robot, which have to be finished before the first program starts
+        :type after: list of Step
+        :param timeout: maximum time given to each program in seconds, forever by default
+        :type timeout: float
+
+        :return: The steps, in the order of the programs
+        :rtype: list of Step
+        """
+
+        steps = []
+        for programName in programNames:
+            steps.append(self.addStep(robotName, programName, after if not steps else None, timeout))
+        return steps
+
+    def run(self):
+        """
+        Run the steps of every robot at the same time, and wait until all of them are finished.
+        When a step fails, the following steps of its robot and the steps depending on it are not run.
+
+        :return: The failed steps, empty when every step succeeded
+        :rtype: list of Step
+        """
+
+        self.__checkCycles()
+        for step in self.steps:
+            step.error = None
+            step.finished.clear()
+
+        robotNames = [robotName for robotName in self.robots
+                      if any(step.robotName == robotName for step in self.steps)]
+        if robotNames:
+            with ThreadPoolExecutor(max_workers=len(robotNames)) as executor:
+                list(executor.map(self.__runRobot, robotNames))
+
+        return [step for step in self.steps if step.error is not None]
+
+    def __runRobot(self, robotName):
+        robot = self.robots[robotName]
+        failed = None
+        for step in [step for step in self.steps if step.robotName == robotName]:
+            for dependency in step.after:
+                dependency.finished.wait()
+                if failed is None and dependency.error is not None:
+                    failed = RuntimeError(repr(dependency) + " failed")
+            if failed is None:
+                try:
+                    robot.runProgram(step.programName, step.timeout)
+                except Exception as error:
+                    failed = error
+            step.error = failed
+            step.finished.set()
+
+    def __checkCycles(self):
+        previous = {}
+        dependencies = {}
+        for step in self.steps:
+            dependencies[step] = list(step.after)
+            if step.robotName in previous:
+                dependencies[step].append(previous[step.robotName])
+            previous[step.robotName] = step
+        for step in self.steps:
+            for dependency in step.after:
+                if dependency not in dependencies:
+                    raise ValueError(repr(dependency) + " is not a step of the fleet")
+
+        visited = set()
+        visiting = set()
+
+        def visit(step):
+            if step in visited:
+                return
+            if step in visiting:
+                raise ValueError(repr(step) + " depends on itself, the fleet would wait forever")
+            visiting.add(step)
+            for dependency in dependencies.get(step, []):
+                visit(dependency)
+            visiting.discard(step)
+            visited.add(step)
+
+        for step in self.steps:
+            visit(step)
@@ -0,0 +1,137 @@
+import bisect
+import threading
+
+DASHBOARD_ROUND_TRIP = "dashboard.roundTrip"
+PRIMARY_BYTES = "primary.bytes"
+PRIMARY_MESSAGES = "primary.messages"
+PRIMARY_DECODE = "primary.decode"
+RUN_PROGRAM_PHASE = "runProgram.phase"
+
+# Upper bounds of the histogram buckets in seconds, from 1 µs to 100 s with 4 buckets per decade
+BUCKETS = tuple(10.0 ** (exponent / 4.0) for exponent in range(-24, 9))
+# Upper bounds of the buckets of the sizes, powers of two up to 1 MiB
+SIZE_BUCKETS = tuple(float(1 << exponent) for exponent in range(21))
+BOUNDS = {PRIMARY_BYTES: SIZE_BUCKETS, PRIMARY_MESSAGES: SIZE_BUCKETS}
+
+
+class Histogram:
+    """
+    Distribution of the values of a measure in fixed buckets, recording a value costs a bisection.
+
+    :param bounds: upper bounds of the buckets, in increasing order, the values above the last bound are counted apart
+    :type bounds: tuple of float
+    """
+
+    def __init__(self, bounds=BUCKETS):
+        self.bounds = bounds
+        self.counts = [0] * (len(bounds) + 1)
+        self.count = 0
+        self.total = 0.0
+        self.min = None
+        self.max = None
+
+    def record(self, value):
+        self.counts[bisect.bisect_left(self.bounds, value)] += 1
+        self.count += 1
+        self.total += value
+        if self.min is None or value < self.min:
+            self.min = value
+        if self.max is None or value > self.max:
+            self.max = value
+
+    def percentile(self, fraction):
+        """
+        :param fraction: the rank of the percentile, 0.99 for the 99th percentile
+        :type fraction: float
+
+        :return: The upper bound of the bucket holding the percentile, capped by the maximum, None if empty
+        :rtype: float
+        """
+
+        if self.count == 0:
+            return None
+        rank = fraction * self.count
+        seen = 0
+        for index, count in enumerate(self.counts):
+            seen += count
+            if seen >= rank and count:
+                return self.max if index == len(self.bounds) else min(self.bounds[index], self.max)
+        return self.max
+
+    def summary(self):
+        """
+        :return: count, total, min, max, mean, p50 and p99 of the values
+        :rtype: dict
+        """
+
+        return {
+            "count": self.count,
+            "total": self.total,
+            "min": self.min,
+            "max": self.max,
+            "mean": self.total / self.count if self.count else None,
+            "p50": self.percentile(0.50),
+            "p99": self.percentile(0.99),
+        }
+
+
+class MetricsCollector:
+    """
+    Metrics callback keeping a Histogram per measure and label, to be given as the metrics of a URRobot,
+    a Dashboard or a Primary.
+
+    A metrics callback is any function called as metrics(name, label, value), from the thread doing the work:
+
+    - DASHBOARD_ROUND_TRIP, the command without its argument, like "robotmode" or "load" (or "batch"), the round-trip in seconds
+    - PRIMARY_BYTES, None, the bytes received by a read
+    - PRIMARY_MESSAGES, None, the messages decoded by a read
+    - PRIMARY_DECODE, the ROBOT_STATE_PACKAGE_TYPE name, the decode time of the package in seconds
+    - RUN_PROGRAM_PHASE, "status", "load", "powerOn", "play", "start" or "finish", the time of the phase in seconds
+
+    Without metrics the instrumented code only tests that the callback is None.
+
+    :param bounds: bucket bounds by measure name, BUCKETS for the measures not listed
+    :type bounds: dict of tuple
+    """
+
+    def __init__(self, bounds=BOUNDS):
+        self.bounds = bounds
+        self.histograms = {}
+        self.__lock = threading.Lock()
+
+    def __call__(self, name, label, value):
+        key = (name, label)
+        with self.__lock:
+            histogram = self.histograms.get(key)
+            if histogram is None:
+                histogram = self.histograms[key] = Histogram(self.bounds.get(name, BUCKETS))
+            histogram.record(value)
+
+    def histogram(self, name, label=None):
+        """
+        :param name: name of the measure, like DASHBOARD_ROUND_TRIP
+        :type name: string
+        :param label: label of the measure, like the command "robotmode"
+        :type label: string
+
+        :return: The histogram of the measure, None if never recorded
+        :rtype: Histogram
+        """
+
+        return self.histograms.get((name, label))
+
+    def summary(self):
+        """
+        :return: The summary of each histogram by measure name and by label
+        :rtype: dict
+        """
+
+        summary = {}
+        with self.__lock:
+            for (name, label), histogram in self.histograms.items():
+                summary.setdefault(name, {})[label] = histogram.summary()
+        return summary
+
+    def reset(self):
+        with self.__lock:
+            self.histograms.clear()
@@ -0,0 +1,130 @@
+from array import array
+from ur_remote.PrimaryEnum import PackageStruct
+from ur_remote.PrimaryState import JointData
+from ur_remote.PrimaryState import CartesianInfo
+
+try:
+    import numpy
+except ImportError:
+    numpy = None
+
+JOINT_COUNT = 6
+JOINT_FIELDS = JointData._fields
+CARTESIAN_FIELDS = ('tcpPose', 'tcpOffset')
+
+if numpy is not None:
+    JOINT_DTYPE = numpy.dtype([
+        ('qActual', '>f8'), ('qTarget', '>f8'), ('qdActual', '>f8'), ('iActual', '>f4'), ('vActual', '>f4'),
+        ('tMotor', '>f4'), ('tMicro', '>f4'), ('jointMode', 'u1')])
+    CARTESIAN_DTYPE = numpy.dtype('>f8')
+
+
+class MotionHistory:
+    """
+    Ring of the latest joint and cartesian samples decoded by the Primary Client, kept in preallocated arrays.
+
+    With NumPy, every joint field is a (capacity, 6) array and the packages are decoded in a single step with a
+    big-endian structured dtype over the received message. Without NumPy, the packages are decoded with the
+    precompiled structs and every field is a flat array.array of capacity * 6 values.
+
+    :param capacity: number of samples kept before the oldest ones are overwritten
+    :type capacity: int
+    """
+
+    def __init__(self, capacity=1000):
+        self.capacity = capacity
+        self.jointCount = 0
+        self.cartesianCount = 0
+        self.joints = {}
+        self.cartesian = {}
+
+        if numpy is not None:
+            for field in JOINT_FIELDS:
+                self.joints[field] = numpy.zeros((capacity, JOINT_COUNT), dtype=JOINT_DTYPE[field].newbyteorder('='))
+            for field in CARTESIAN_FIELDS:
+                self.cartesian[field] = numpy.zeros((capacity, 6))
+        else:
+            for field in JOINT_FIELDS:
+                typeCode = 'B' if field == 'jointMode' else 'd'
+                self.joints[field] = array(typeCode, [0]) * (capacity * JOINT_COUNT)
+            for field in CARTESIAN_FIELDS:
+                self.cartesian[field] = array('d', [0]) * (capacity * 6)
+
+    def appendJointData(self, data, offset):
+        """
+        Decode a JOINT_DATA package in the next row of the ring
+
+        :param data: the message holding the package
+        :type data: bytes-like object
+        :param offset: offset of the package content, after its header
+        :type offset: int
+        """
+
+        row = self.jointCount % self.capacity
+        if numpy is not None:
+            joints = numpy.frombuffer(data, dtype=JOINT_DTYPE, count=JOINT_COUNT, offset=offset)
+            for field in JOINT_FIELDS:
+                self.joints[field][row] = joints[field]
+        else:
+            values = PackageStruct.JOINT_DATA.unpack_from(data, offset)
+            start = row * JOINT_COUNT
+            for index, field in enumerate(JOINT_FIELDS):
+                column = self.joints[field]
+                column[start:start + JOINT_COUNT] = array(column.typecode, values[index::len(JOINT_FIELDS)])
+        self.jointCount += 1
+
+    def appendCartesianInfo(self, data, offset):
+        """
+        Decode a CARTESIAN_INFO package in the next row of the ring
+
+        :param data: the message holding the package
+        :type data: bytes-like object
+        :param offset: offset of the package content, after its header
+        :type offset: int
+        """
+
+        row = self.cartesianCount % self.capacity
+        if numpy is not None:
+            values = numpy.frombuffer(data, dtype=CARTESIAN_DTYPE, count=len(CartesianInfo._fields), offset=offset)
+            self.cartesian['tcpPose'][row] = values[0:6]
+            self.cartesian['tcpOffset'][row] = values[6:12]
+        else:
+            values = PackageStruct.CARTESIAN_INFO.unpack_from(data, offset)
+            start = row * 6
+            self.cartesian['tcpPose'][start:start + 6] = array('d', values[0:6])
+            self.cartesian['tcpOffset'][start:start + 6] = array('d', values[6:12])
+        self.cartesianCount += 1
+
+    def getJoints(self, field, count=None):
+        """
+        :param field: a JointData field, like qActual or tMotor
+        :type field: string
+        :param count: number of samples returned, all the samples kept by default
+        :type count: int
+
+        :return: The latest samples of the field from the oldest to the newest, one row of six joints per sample
+        :rtype: numpy.ndarray of shape (count, 6), or list of tuples without NumPy
+        """
+
+        return self.__latest(self.joints[field], self.jointCount, count)
+
+    def getCartesian(self, field, count=None):
+        """
+        :param field: tcpPose or tcpOffset
+        :type field: string
+        :param count: number of samples returned, all the samples kept by default
+        :type count: int
+
+        :return: The latest samples of the field from the oldest to the newest, one row of six values per sample
+        :rtype: numpy.ndarray of shape (count, 6), or list of tuples without NumPy
+        """
+
+        return self.__latest(self.cartesian[field], self.cartesianCount, count)
+
+    def __latest(self, column, written, count):
+        kept = min(written, self.capacity)
+        count = kept if count is None else min(count, kept)
+        rows = [(written - count + index) % self.capacity for index in range(count)]
+        if numpy is not None:
+            return column[rows]
+        return [tuple(column[row * 6:row * 6 + 6]) for row in rows]
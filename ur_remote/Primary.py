@@ -1,11 +1,45 @@
 import socket
 import struct
-from ur_remote.PrimaryEnum import DataFormat
-from ur_remote.PrimaryEnum import SizeFormat
+from collections import deque
+import threading
+import time
 from ur_remote.PrimaryEnum import MESSAGE_TYPE
 from ur_remote.PrimaryEnum import ROBOT_STATE_PACKAGE_TYPE
+from ur_remote.PrimaryEnum import ROBOT_MESSAGE_TYPE
+from ur_remote.PrimaryEnum import PackageStruct
+from ur_remote.PrimaryFramer import PrimaryFramer
+from ur_remote.Connection import Connection
+from ur_remote.Connection import STREAM_PROFILE
+from ur_remote.Metrics import PRIMARY_BYTES
+from ur_remote.Metrics import PRIMARY_MESSAGES
+from ur_remote.Metrics import PRIMARY_DECODE
+from ur_remote.PrimaryState import RobotModeData
+from ur_remote.PrimaryState import JointData
+from ur_remote.PrimaryState import ToolData
+from ur_remote.PrimaryState import MasterboardData
+from ur_remote.PrimaryState import CartesianInfo
+from ur_remote.PrimaryState import KinematicsInfo
+from ur_remote.PrimaryState import ConfigurationData
+from ur_remote.PrimaryState import ForceModeData
+from ur_remote.PrimaryState import AdditionalInfo
+from ur_remote.PrimaryState import ToolCommInfo
+from ur_remote.PrimaryState import ToolModeInfo
+from ur_remote.PrimaryState import SingularityInfo
+from ur_remote.PrimaryState import RobotState
+from ur_remote.PrimaryState import LazyRecord
+from ur_remote.PrimaryMessage import TextMessage
+from ur_remote.PrimaryMessage import ProgramLabelMessage
+from ur_remote.PrimaryMessage import PopupMessage
+from ur_remote.PrimaryMessage import VersionMessage
+from ur_remote.PrimaryMessage import SafetyModeMessage
+from ur_remote.PrimaryMessage import ErrorCodeMessage
+from ur_remote.PrimaryMessage import KeyMessage
+from ur_remote.PrimaryMessage import RequestValueMessage
+from ur_remote.PrimaryMessage import RuntimeExceptionMessage
 
 PRIMARY_PORT = 30011
+READER_TIMEOUT = 0.5
+MESSAGE_QUEUE_SIZE = 100
 
 
 class Primary:
@@ -16,12 +50,75 @@ class Primary:
 
     :param ipAddress: the ip address of the Universal Robot.
     :type ipAddress: string
+    :param motionHistory: optional ring filled with the joint and cartesian samples of every ROBOT_STATE message
+    :type motionHistory: MotionHistory
+    :param options: tuning of the socket, a large receive buffer and a timeout detecting a silent controller by default
+    :type options: SocketOptions
+    :param recorder: optional log appended with every message received
+    :type recorder: PrimaryRecorder
+    :param port: the port of the primary client
+    :type port: int
+    :param metrics: optional callback measuring the bytes and messages of each read and the decode time of each package, see MetricsCollector
+    :type metrics: callable
+    :param messageQueueSize: number of robot messages kept until read by getMessage, the oldest ones being dropped first
+    :type messageQueueSize: int
     """
 
-    def __init__(self, ipAddress):
+    def __init__(self, ipAddress, motionHistory=None, options=STREAM_PROFILE, recorder=None, port=PRIMARY_PORT,
+                 metrics=None, messageQueueSize=MESSAGE_QUEUE_SIZE):
         self.ipAddress = ipAddress
-        self.server = socket.socket(socket.AF_INET, socket.SOCK_STREAM)
-        self.offset = 0
+        self.port = port
+        self.metrics = metrics
+        self.motionHistory = motionHistory
+        self.recorder = recorder
+        self.framer = PrimaryFramer()
+        self.connection = Connection(ipAddress, port, onConnect=self.framer.reset, options=options)
+        self.state = RobotState()
+        self.sequence = 0
+        self.snapshot = (self.sequence, self.state)
+        self.readerError = None
+        self.decodeErrors = 0
+        self.lastDecodeError = None
+        self.listenerErrors = 0
+        self.lastListenerError = None
+        self.__reader = None
+        self.__stopReader = threading.Event()
+        self.__stateChanged = threading.Condition()
+        self.stateListeners = []
+        self.messageQueue = deque(maxlen=messageQueueSize)
+        self.droppedMessages = 0
+        self.messageListeners = []
+        self.__packageReaders = {
+            ROBOT_STATE_PACKAGE_TYPE.ROBOT_MODE_DATA: ('robotModeData', self.__readRobotModeData),
+            ROBOT_STATE_PACKAGE_TYPE.JOINT_DATA: ('jointData', self.__readJointData),
+            ROBOT_STATE_PACKAGE_TYPE.TOOL_DATA: ('toolData', self.__readToolData),
+            ROBOT_STATE_PACKAGE_TYPE.MASTERBOARD_DATA: ('masterboardData', self.__readMasterboardData),
+            ROBOT_STATE_PACKAGE_TYPE.CARTESIAN_INFO: ('cartesianInfo', self.__readCartesianInfo),
+            ROBOT_STATE_PACKAGE_TYPE.KINEMATICS_INFO: ('kinematicsInfo', self.__readKinematicsInfo),
+            ROBOT_STATE_PACKAGE_TYPE.CONFIGURATION_DATA: ('configurationData', self.__readConfigurationData),
+            ROBOT_STATE_PACKAGE_TYPE.FORCE_MODE_DATA: ('forceModeData', self.__readForceModeData),
+            ROBOT_STATE_PACKAGE_TYPE.ADDITIONAL_INFO: ('additionalInfo', self.__readAdditionalInfo),
+            ROBOT_STATE_PACKAGE_TYPE.TOOL_COMM_INFO: ('toolCommInfo', self.__readToolCommInfo),
+            ROBOT_STATE_PACKAGE_TYPE.TOOL_MODE_INFO: ('toolModeInfo', self.__readToolModeInfo),
+            ROBOT_STATE_PACKAGE_TYPE.SINGULARITY_INFO: ('singularityInfo', self.__readSingularityInfo),
+        }
+        self.__subscribedReaders = self.__packageReaders
+        # Reader of each robot message type, with the size of its fixed fields checked before decoding
+        self.__messageReaders = {
+            ROBOT_MESSAGE_TYPE.TEXT: (0, self.__readTextMessage),
+            ROBOT_MESSAGE_TYPE.PROGRAM_LABEL: (PackageStruct.PROGRAM_LABEL_MESSAGE.size,
+                                               self.__readProgramLabelMessage),
+            ROBOT_MESSAGE_TYPE.POPUP: (PackageStruct.POPUP_MESSAGE.size, self.__readPopupMessage),
+            ROBOT_MESSAGE_TYPE.VERSION: (PackageStruct.VERSION_NAME_SIZE.size + PackageStruct.VERSION_MESSAGE.size,
+                                         self.__readVersionMessage),
+            ROBOT_MESSAGE_TYPE.SAFETY_MODE: (PackageStruct.SAFETY_MODE_MESSAGE.size, self.__readSafetyModeMessage),
+            ROBOT_MESSAGE_TYPE.ERROR_CODE: (PackageStruct.ERROR_CODE_MESSAGE.size, self.__readErrorCodeMessage),
+            ROBOT_MESSAGE_TYPE.KEY: (PackageStruct.KEY_MESSAGE.size, self.__readKeyMessage),
+            ROBOT_MESSAGE_TYPE.REQUEST_VALUE: (PackageStruct.REQUEST_VALUE_MESSAGE.size,
+                                               self.__readRequestValueMessage),
+            ROBOT_MESSAGE_TYPE.RUNTIME_EXCEPTION: (PackageStruct.RUNTIME_EXCEPTION_MESSAGE.size,
+                                                   self.__readRuntimeExceptionMessage),
+        }
 
     def connect(self):
         """
@@ -31,125 +128,464 @@ class Primary:
         :rtype: string
         """
 
-        return self.server.connect((self.ipAddress, PRIMARY_PORT))
+        return self.connection.connect()
 
-    def __unpack(self, data, dataType, offset):
-        unpacked_data = struct.unpack_from('!' + dataType, data, self.offset)[0]
-        self.offset += offset
-        return unpacked_data
+    def isConnected(self):
+        """
+        :return: True if the connection is open, it is otherwise reopened by the next read
+        :rtype: boolean
+        """
+
+        return self.connection.isConnected()
+
+    def readMessages(self):
+        """
+        Receive the available bytes of the stream and yield the messages completed by them.
+        The messages are views on the receive buffer, only valid until the next read.
+
+        :return: The complete messages, header included
+        :rtype: generator of memoryview
+        """
 
-    def __unpackString(self, data, size):
-        unpacked_data = struct.unpack_from(('!%d' + DataFormat.STRING) % size, data, self.offset)[0]
-        self.offset += size * SizeFormat.UNSIGNED_CHAR
-        return unpacked_data
+        self.connection.ensureConnected()
+        received = self.framer.recvInto(self.connection)
+        if self.metrics is not None:
+            self.metrics(PRIMARY_BYTES, None, received)
+
+        return self.framer.messages()
 
     def readPort(self):
-        data = self.server.recv(4096)
-        self.offset = 0
-
-        if data:
-            messageSize = self.__unpack(data, DataFormat.INT, SizeFormat.INT)
-            messageType = self.__unpack(data, DataFormat.UNSIGNED_CHAR, SizeFormat.UNSIGNED_CHAR)
-            if messageType == MESSAGE_TYPE.ROBOT_STATE:
-                self.__readRobotState(data)
-            elif messageType == MESSAGE_TYPE.ROBOT_MESSAGE:
-                self.__readRobotMessage(data)
-
-    def __readRobotState(self, data):
-        packageSize = self.__unpack(data, DataFormat.INT, SizeFormat.INT)
-        packageType = self.__unpack(data, DataFormat.UNSIGNED_CHAR, SizeFormat.UNSIGNED_CHAR)
-        if packageType == ROBOT_STATE_PACKAGE_TYPE.ROBOT_MODE_DATA:
-            self.__readRobotModeData(data)
-        elif packageType == ROBOT_STATE_PACKAGE_TYPE.JOINT_DATA:
-            self.__readJointData(data)
-        elif packageType == ROBOT_STATE_PACKAGE_TYPE.TOOL_DATA:
-            self.__readToolData(data)
-        elif packageType == ROBOT_STATE_PACKAGE_TYPE.MASTERBOARD_DATA:
-            self.__readMasterboardData(data)
-        elif packageType == ROBOT_STATE_PACKAGE_TYPE.CARTESIAN_INFO:
-            self.__readCartesianInfo(data)
-        elif packageType == ROBOT_STATE_PACKAGE_TYPE.KINEMATICS_INFO:
-            self.__readKinematicsInfo(data)
-        elif packageType == ROBOT_STATE_PACKAGE_TYPE.CONFIGURATION_DATA:
-            self.__readConfigurationData(data)
-        elif packageType == ROBOT_STATE_PACKAGE_TYPE.FORCE_MODE_DATA:
-            self.__readForceModeData(data)
-        elif packageType == ROBOT_STATE_PACKAGE_TYPE.ADDITIONAL_INFO:
-            self.__readAdditionalInfo(data)
-        elif packageType == ROBOT_STATE_PACKAGE_TYPE.TOOL_COMM_INFO:
-            self.__readToolCommInfo(data)
-        elif packageType == ROBOT_STATE_PACKAGE_TYPE.TOOL_MODE_INFO:
-            self.__readToolModeInfo(data)
-        elif packageType == ROBOT_STATE_PACKAGE_TYPE.SINGULARITY_INFO:
-            self.__readSingularityInfo(data)
-
-    def __readRobotMessage(self, data):
-        """timestamp = self.__unpack(data, DataFormat.UNSIGNED_LONG_LONG, SizeFormat.UNSIGNED_LONG_LONG)
-        source = self.__unpack(data, DataFormat.UNSIGNED_CHAR, SizeFormat.UNSIGNED_CHAR)
-        robotMessageType = self.__unpack(data, DataFormat.UNSIGNED_CHAR, SizeFormat.UNSIGNED_CHAR)
-        if robotMessageType == 9:
-            requestId = self.__unpack(data, DataFormat.UNSIGNED_INT, SizeFormat.UNSIGNED_INT)
-            requestedType = self.__unpack(data, DataFormat.UNSIGNED_INT, SizeFormat.UNSIGNED_INT)
-            warning = self.__unpack(data, DataFormat.BOOLEAN, SizeFormat.BOOLEAN)
-            error = self.__unpack(data, DataFormat.BOOLEAN, SizeFormat.BOOLEAN)
-            blocking = self.__unpack(data, DataFormat.BOOLEAN, SizeFormat.BOOLEAN)
-            popupMessageTitleSize = self.__unpack(data, DataFormat.UNSIGNED_CHAR, SizeFormat.UNSIGNED_CHAR)
-            popupMessageTitle = self.__unpackString(data, popupMessageTitleSize)
-            popupTextMessage = self.__unpackString(data, 4)
-        elif robotMessageType == 7:
-            robotMessageCode = self.__unpack(data, DataFormat.INT, SizeFormat.INT)
-            robotMessageArgument = self.__unpack(data, DataFormat.INT, SizeFormat.INT)
-            robotMessageTitleSize = self.__unpack(data, DataFormat.UNSIGNED_CHAR, SizeFormat.UNSIGNED_CHAR)
-            robotMessageTitle = self.__unpackString(data, robotMessageTitleSize)
-            keyTextMessage = self.__unpackString(data, 8)"""
-
-    def __readRobotModeData(self, data):
-        timestamp = self.__unpack(data, DataFormat.UNSIGNED_LONG_LONG, SizeFormat.UNSIGNED_LONG_LONG)
-        isRealRobotConnected = self.__unpack(data, DataFormat.BOOLEAN, SizeFormat.BOOLEAN)
-        isRealRobotEnabled = self.__unpack(data, DataFormat.BOOLEAN, SizeFormat.BOOLEAN)
-        isRobotPowerOn = self.__unpack(data, DataFormat.BOOLEAN, SizeFormat.BOOLEAN)
-        isEmergencyStopped = self.__unpack(data, DataFormat.BOOLEAN, SizeFormat.BOOLEAN)
-        isProtectiveStopped = self.__unpack(data, DataFormat.BOOLEAN, SizeFormat.BOOLEAN)
-        isProgramRunning = self.__unpack(data, DataFormat.BOOLEAN, SizeFormat.BOOLEAN)
-        isProgramPaused = self.__unpack(data, DataFormat.BOOLEAN, SizeFormat.BOOLEAN)
-        robotMode = self.__unpack(data, DataFormat.UNSIGNED_CHAR, SizeFormat.UNSIGNED_CHAR)
-        controlMode = self.__unpack(data, DataFormat.UNSIGNED_CHAR, SizeFormat.UNSIGNED_CHAR)
-        targetSpeedFraction = self.__unpack(data, DataFormat.DOUBLE, SizeFormat.DOUBLE)
-        speedScaling = self.__unpack(data, DataFormat.DOUBLE, SizeFormat.DOUBLE)
-        targetSpeedFractionLimit = self.__unpack(data, DataFormat.DOUBLE, SizeFormat.DOUBLE)
-
-    def __readJointData(self, data):
-        pass
-
-    def __readToolData(self, data):
-        pass
-
-    def __readMasterboardData(self, data):
-        pass
-
-    def __readCartesianInfo(self, data):
-        pass
-
-    def __readKinematicsInfo(self, data):
-        pass
-
-    def __readConfigurationData(self, data):
-        pass
-
-    def __readForceModeData(self, data):
-        pass
-
-    def __readAdditionalInfo(self, data):
-        pass
-
-    def __readToolCommInfo(self, data):
-        pass
-
-    def __readToolModeInfo(self, data):
-        pass
-
-    def __readSingularityInfo(self, data):
-        pass
+        """
+        Receive the available bytes of the stream and decode every message completed by them.
+        A message out of sync or too short for its decoder is counted in decodeErrors, then raised after closing the
+        connection: the next read restarts the stream from a message boundary. An exception of the recorder or of a
+        listener is counted in listenerErrors and does not stop the decoding.
+
+        :return: The number of messages decoded
+        :rtype: int
+        """
+
+        count = 0
+        messages = self.readMessages()
+        recorder = self.recorder
+        receivedAt = time.time() if recorder is not None else None
+        try:
+            # only the framer and the decoders raise here, the recorder and the listeners are isolated
+            for message in messages:
+                if recorder is not None:
+                    self.__record(message, receivedAt)
+                self.decode(message)
+                count += 1
+        except (ValueError, struct.error) as error:
+            self.decodeErrors += 1
+            self.lastDecodeError = error
+            self.framer.reset()
+            self.connection.close()
+            raise
+        if self.metrics is not None:
+            self.metrics(PRIMARY_MESSAGES, None, count)
+        return count
+
+    def decode(self, message):
+        """
+        Decode a complete message of the Primary Client
+
+        :param message: the message, header included
+        :type message: bytes-like object
+        """
+
+        messageSize, messageType = PackageStruct.MESSAGE_HEADER.unpack_from(message, 0)
+        if messageType == MESSAGE_TYPE.ROBOT_STATE:
+            self.__readRobotState(message, PackageStruct.MESSAGE_HEADER.size)
+        elif messageType == MESSAGE_TYPE.ROBOT_MESSAGE:
+            self.__readRobotMessage(message, PackageStruct.MESSAGE_HEADER.size)
+
+    def __readRobotState(self, data, offset):
+        packageHeader = PackageStruct.PACKAGE_HEADER
+        packageReaders = self.__subscribedReaders
+        metrics = self.metrics
+        packages = {}
+        messageEnd = len(data)
+        packageStart = offset
+        while packageStart + packageHeader.size <= messageEnd:
+            packageSize, packageType = packageHeader.unpack_from(data, packageStart)
+            if packageSize < packageHeader.size or packageStart + packageSize > messageEnd:
+                break
+            packageReader = packageReaders.get(packageType)
+            if packageReader is not None:
+                name, reader = packageReader
+                if metrics is None:
+                    packages[name] = reader(data, packageStart + packageHeader.size)
+                else:
+                    start = time.perf_counter()
+                    packages[name] = reader(data, packageStart + packageHeader.size)
+                    metrics(PRIMARY_DECODE, ROBOT_STATE_PACKAGE_TYPE(packageType).name, time.perf_counter() - start)
+            packageStart += packageSize
+        self.__publish(self.state._replace(**packages))
+
+    def subscribe(self, packageTypes=None, lazy=False):
+        """
+        Decode only some package types, the other packages being skipped by their size and keeping their last value
+        in the state (None if never decoded).
+
+        When lazy, each subscribed package is kept as bytes in a LazyRecord and only decoded when one of its fields
+        is read, so the packages of the states nobody looks at are never decoded. The joint data and cartesian info
+        feeding a MotionHistory are always decoded at once.
+
+        :param packageTypes: the decoded package types, every known type by default
+        :type packageTypes: list of ROBOT_STATE_PACKAGE_TYPE
+        :param lazy: defer the decoding of each package until one of its fields is read
+        :type lazy: boolean
+        """
+
+        if packageTypes is None:
+            packageTypes = self.__packageReaders.keys()
+        subscribedReaders = {}
+        for packageType in packageTypes:
+            if packageType not in self.__packageReaders:
+                raise ValueError(str(packageType) + " is not a decoded ROBOT_STATE package type")
+            name, reader = self.__packageReaders[packageType]
+            if lazy and not (self.motionHistory is not None and packageType in (
+                    ROBOT_STATE_PACKAGE_TYPE.JOINT_DATA, ROBOT_STATE_PACKAGE_TYPE.CARTESIAN_INFO)):
+                reader = self.__lazyReader(reader)
+            subscribedReaders[packageType] = (name, reader)
+        self.__subscribedReaders = subscribedReaders
+
+    @staticmethod
+    def __lazyReader(reader):
+        packageHeader = PackageStruct.PACKAGE_HEADER
+
+        def readLazily(data, offset):
+            packageSize = packageHeader.unpack_from(data, offset - packageHeader.size)[0]
+            return LazyRecord(reader, bytes(data[offset:offset - packageHeader.size + packageSize]))
+
+        return readLazily
+
+    def __publish(self, state):
+        self.state = state
+        self.sequence += 1
+        self.snapshot = (self.sequence, state)
+        self.__notify(self.stateListeners, state)
+        with self.__stateChanged:
+            self.__stateChanged.notify_all()
+
+    def __notify(self, listeners, value):
+        # A failing listener must neither stop the reader nor be taken for a decode error
+        for listener in listeners:
+            try:
+                listener(value)
+            except Exception as error:
+                self.listenerErrors += 1
+                self.lastListenerError = error
+
+    def __record(self, message, receivedAt):
+        try:
+            self.recorder.record(message, receivedAt)
+        except Exception as error:
+            self.listenerErrors += 1
+            self.lastListenerError = error
+
+    def addStateListener(self, listener):
+        """
+        Call a function with each new state, from the thread decoding the messages.
+        An exception of the function is counted in listenerErrors, the next listeners are still called.
+
+        :param listener: function called with the new RobotState
+        :type listener: callable
+        """
+
+        self.stateListeners.append(listener)
+
+    def removeStateListener(self, listener):
+        """
+        :param listener: function added by addStateListener
+        :type listener: callable
+        """
+
+        self.stateListeners.remove(listener)
+
+    def __publishMessage(self, message):
+        if len(self.messageQueue) == self.messageQueue.maxlen:
+            self.droppedMessages += 1
+        self.messageQueue.append(message)
+        self.__notify(self.messageListeners, message)
+        with self.__stateChanged:
+            self.__stateChanged.notify_all()
+
+    def addMessageListener(self, listener):
+        """
+        Call a function with each robot message, like a popup or a runtime exception, from the thread decoding
+        the messages. An exception of the function is counted in listenerErrors, the next listeners are still called.
+
+        :param listener: function called with the record of the message, like PopupMessage
+        :type listener: callable
+        """
+
+        self.messageListeners.append(listener)
+
+    def removeMessageListener(self, listener):
+        """
+        :param listener: function added by addMessageListener
+        :type listener: callable
+        """
+
+        self.messageListeners.remove(listener)
+
+    def getMessage(self, timeout=0):
+        """
+        Take the oldest robot message not yet read, waiting for the background reader to decode one
+
+        :param timeout: maximum time to wait in seconds, None to wait forever, without waiting by default
+        :type timeout: float
+
+        :return: The record of the message, like PopupMessage or RuntimeExceptionMessage, None if the timeout expired
+        """
+
+        with self.__stateChanged:
+            self.__stateChanged.wait_for(lambda: self.readerError is not None or self.messageQueue, timeout)
+            if self.messageQueue:
+                return self.messageQueue.popleft()
+        if self.readerError is not None:
+            raise ConnectionError("Primary reader of " + self.ipAddress + " stopped") from self.readerError
+        return None
+
+    def getState(self):
+        """
+        :return: The latest decoded package of each type
+        :rtype: RobotState
+        """
+
+        return self.snapshot[1]
+
+    def getSnapshot(self):
+        """
+        Read the latest state without blocking, the state and its sequence number are published together
+
+        :return: The sequence number of the latest ROBOT_STATE message and the state decoded from it
+        :rtype: tuple(int, RobotState)
+        """
+
+        return self.snapshot
+
+    def waitForState(self, predicate, timeout=None):
+        """
+        Block until a decoded state satisfies the predicate, without polling the controller
+
+        :param predicate: function called with each new RobotState, returning True when the state is the awaited one
+        :type predicate: callable
+        :param timeout: maximum time to wait in seconds, forever by default
+        :type timeout: float
+
+        :return: The state satisfying the predicate, None if the timeout expired
+        :rtype: RobotState
+        """
+
+        with self.__stateChanged:
+            satisfied = self.__stateChanged.wait_for(
+                lambda: self.readerError is not None or predicate(self.snapshot[1]), timeout)
+        if self.readerError is not None:
+            raise ConnectionError("Primary reader of " + self.ipAddress + " stopped") from self.readerError
+        return self.snapshot[1] if satisfied else None
+
+    def startReader(self):
+        """
+        Start a background thread draining the stream and publishing the latest state, so that reading the state
+        never blocks on the socket and the receive buffer of the system never overflows.
+        A lost connection is restored with backoff until stopReader is called, see connection.getHealth meanwhile.
+        """
+
+        if self.isReading():
+            return
+        self.readerError = None
+        self.__stopReader.clear()
+        self.__reader = threading.Thread(target=self.__read, name="Primary " + self.ipAddress, daemon=True)
+        self.__reader.start()
+
+    def stopReader(self, timeout=None):
+        """
+        Stop the background thread started by startReader
+
+        :param timeout: maximum time to wait for the thread in seconds, forever by default
+        :type timeout: float
+        """
+
+        self.__stopReader.set()
+        if self.__reader is not None:
+            self.__reader.join(timeout)
+            self.__reader = None
+
+    def isReading(self):
+        """
+        :return: True if the background thread is draining the stream
+        :rtype: boolean
+        """
+
+        return self.__reader is not None and self.__reader.is_alive()
+
+    def __read(self):
+        streamTimeout = self.connection.options.timeout
+        self.connection.settimeout(READER_TIMEOUT if streamTimeout is None else min(READER_TIMEOUT, streamTimeout))
+        silence = 0.0
+        try:
+            while not self.__stopReader.is_set():
+                try:
+                    self.readPort()
+                    silence = 0.0
+                except socket.timeout:
+                    silence += self.connection.timeout
+                    if streamTimeout is not None and silence >= streamTimeout:
+                        silence = 0.0
+                        self.__reconnect()
+                except (ConnectionError, ValueError, struct.error):
+                    self.__reconnect()
+        except Exception as error:
+            self.readerError = error
+            with self.__stateChanged:
+                self.__stateChanged.notify_all()
+        finally:
+            self.connection.settimeout(streamTimeout)
+
+    def __reconnect(self):
+        """
+        Reconnect with backoff until the reader is stopped, a controller restart can take minutes.
+        The outage is reported by the health of the connection meanwhile.
+        """
+        backoff = self.connection.backoff
+        while not self.__stopReader.is_set():
+            try:
+                self.connection.connect()
+                return
+            except OSError:
+                self.__stopReader.wait(backoff)
+                backoff = min(2 * backoff, self.connection.maxBackoff)
+
+    def __readRobotMessage(self, data, offset):
+        header = PackageStruct.ROBOT_MESSAGE_HEADER
+        if offset + header.size > len(data):
+            self.__skipShortMessage(data)
+            return
+        timestamp, source, robotMessageType = header.unpack_from(data, offset)
+        messageReader = self.__messageReaders.get(robotMessageType)
+        if messageReader is None:
+            return
+        fixedSize, reader = messageReader
+        offset += header.size
+        if offset + fixedSize > len(data):
+            self.__skipShortMessage(data)
+            return
+        message = reader(data, offset, timestamp, source)
+        if message is None:
+            self.__skipShortMessage(data)
+            return
+        self.__publishMessage(message)
+
+    def __skipShortMessage(self, data):
+        # The stream is still in sync, only this message is skipped
+        self.decodeErrors += 1
+        self.lastDecodeError = ValueError("Robot message of " + str(len(data)) + " bytes too short for its type")
+
+    @staticmethod
+    def __readText(data, start, end=None):
+        return bytes(data[start:end]).decode('utf-8', 'replace')
+
+    def __readTextMessage(self, data, offset, timestamp, source):
+        return TextMessage(timestamp, source, self.__readText(data, offset))
+
+    def __readProgramLabelMessage(self, data, offset, timestamp, source):
+        labelId = PackageStruct.PROGRAM_LABEL_MESSAGE.unpack_from(data, offset)[0]
+        return ProgramLabelMessage(timestamp, source, labelId,
+                                   self.__readText(data, offset + PackageStruct.PROGRAM_LABEL_MESSAGE.size))
+
+    def __readPopupMessage(self, data, offset, timestamp, source):
+        requestId, requestedType, warning, error, blocking, titleSize = \
+            PackageStruct.POPUP_MESSAGE.unpack_from(data, offset)
+        offset += PackageStruct.POPUP_MESSAGE.size
+        return PopupMessage(timestamp, source, requestId, requestedType, warning, error, blocking,
+                            self.__readText(data, offset, offset + titleSize),
+                            self.__readText(data, offset + titleSize))
+
+    def __readVersionMessage(self, data, offset, timestamp, source):
+        nameSize = PackageStruct.VERSION_NAME_SIZE.unpack_from(data, offset)[0]
+        offset += PackageStruct.VERSION_NAME_SIZE.size
+        if nameSize < 0 or offset + nameSize + PackageStruct.VERSION_MESSAGE.size > len(data):
+            return None
+        projectName = self.__readText(data, offset, offset + nameSize)
+        offset += nameSize
+        majorVersion, minorVersion, bugfixVersion, buildNumber = PackageStruct.VERSION_MESSAGE.unpack_from(data, offset)
+        return VersionMessage(timestamp, source, projectName, majorVersion, minorVersion, bugfixVersion, buildNumber,
+                              self.__readText(data, offset + PackageStruct.VERSION_MESSAGE.size))
+
+    def __readSafetyModeMessage(self, data, offset, timestamp, source):
+        return SafetyModeMessage(timestamp, source, *PackageStruct.SAFETY_MODE_MESSAGE.unpack_from(data, offset))
+
+    def __readErrorCodeMessage(self, data, offset, timestamp, source):
+        values = PackageStruct.ERROR_CODE_MESSAGE.unpack_from(data, offset)
+        return ErrorCodeMessage(timestamp, source, *values,
+                                self.__readText(data, offset + PackageStruct.ERROR_CODE_MESSAGE.size))
+
+    def __readKeyMessage(self, data, offset, timestamp, source):
+        code, argument, titleSize = PackageStruct.KEY_MESSAGE.unpack_from(data, offset)
+        offset += PackageStruct.KEY_MESSAGE.size
+        return KeyMessage(timestamp, source, code, argument, self.__readText(data, offset, offset + titleSize),
+                          self.__readText(data, offset + titleSize))
+
+    def __readRequestValueMessage(self, data, offset, timestamp, source):
+        requestId, requestedType = PackageStruct.REQUEST_VALUE_MESSAGE.unpack_from(data, offset)
+        return RequestValueMessage(timestamp, source, requestId, requestedType,
+                                   self.__readText(data, offset + PackageStruct.REQUEST_VALUE_MESSAGE.size))
+
+    def __readRuntimeExceptionMessage(self, data, offset, timestamp, source):
+        line, column = PackageStruct.RUNTIME_EXCEPTION_MESSAGE.unpack_from(data, offset)
+        return RuntimeExceptionMessage(timestamp, source, line, column,
+                                       self.__readText(data, offset + PackageStruct.RUNTIME_EXCEPTION_MESSAGE.size))
+
+    def __readRobotModeData(self, data, offset):
+        return RobotModeData._make(PackageStruct.ROBOT_MODE_DATA.unpack_from(data, offset))
+
+    def __readJointData(self, data, offset):
+        if self.motionHistory is not None:
+            self.motionHistory.appendJointData(data, offset)
+        values = PackageStruct.JOINT_DATA.unpack_from(data, offset)
+        fields = len(JointData._fields)
+        return tuple([JointData._make(values[joint:joint + fields]) for joint in range(0, len(values), fields)])
+
+    def __readToolData(self, data, offset):
+        return ToolData._make(PackageStruct.TOOL_DATA.unpack_from(data, offset))
+
+    def __readMasterboardData(self, data, offset):
+        values = PackageStruct.MASTERBOARD_DATA.unpack_from(data, offset)
+        euromap67InterfaceInstalled = values[-1]
+        if euromap67InterfaceInstalled:
+            offset += PackageStruct.MASTERBOARD_DATA.size
+            values += PackageStruct.MASTERBOARD_EUROMAP_DATA.unpack_from(data, offset)
+        return MasterboardData(*values)
+
+    def __readCartesianInfo(self, data, offset):
+        if self.motionHistory is not None:
+            self.motionHistory.appendCartesianInfo(data, offset)
+        return CartesianInfo._make(PackageStruct.CARTESIAN_INFO.unpack_from(data, offset))
+
+    def __readKinematicsInfo(self, data, offset):
+        values = PackageStruct.KINEMATICS_INFO.unpack_from(data, offset)
+        return KinematicsInfo(values[0:6], values[6:12], values[12:18], values[18:24], values[24:30], values[30])
+
+    def __readConfigurationData(self, data, offset):
+        values = PackageStruct.CONFIGURATION_DATA.unpack_from(data, offset)
+        return ConfigurationData(values[0:12:2], values[1:12:2], values[12:24:2], values[13:24:2],
+                                 *values[24:29], values[29:35], values[35:41], values[41:47], values[47:53],
+                                 *values[53:57])
+
+    def __readForceModeData(self, data, offset):
+        return ForceModeData._make(PackageStruct.FORCE_MODE_DATA.unpack_from(data, offset))
+
+    def __readAdditionalInfo(self, data, offset):
+        return AdditionalInfo._make(PackageStruct.ADDITIONAL_INFO.unpack_from(data, offset))
 
+    def __readToolCommInfo(self, data, offset):
+        return ToolCommInfo._make(PackageStruct.TOOL_COMM_INFO.unpack_from(data, offset))
 
+    def __readToolModeInfo(self, data, offset):
+        return ToolModeInfo._make(PackageStruct.TOOL_MODE_INFO.unpack_from(data, offset))
 
+    def __readSingularityInfo(self, data, offset):
+        return SingularityInfo._make(PackageStruct.SINGULARITY_INFO.unpack_from(data, offset))
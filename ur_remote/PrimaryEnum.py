@@ -1,3 +1,4 @@
+import struct
 from enum import Enum
 from enum import IntEnum
 
@@ -29,6 +30,54 @@ class ROBOT_STATE_PACKAGE_TYPE(IntEnum):
     TOOL_MODE_INFO = 12
     SINGULARITY_INFO = 13
 
+
+class ROBOT_MESSAGE_TYPE(IntEnum):
+    TEXT = 0
+    PROGRAM_LABEL = 1
+    POPUP = 2
+    VERSION = 3
+    SAFETY_MODE = 5
+    ERROR_CODE = 6
+    KEY = 7
+    REQUEST_VALUE = 9
+    RUNTIME_EXCEPTION = 10
+
+
+class PackageStruct:
+    """
+    Precompiled layouts of the messages and of the ROBOT_STATE packages, decoding a whole package in a single call.
+    The package layouts exclude the package header (packageSize and packageType).
+    The ROBOT_MESSAGE layouts follow the ROBOT_MESSAGE_HEADER (timestamp, source and robotMessageType), and
+    exclude the strings of variable size.
+    Based on the Primary Client documentation of the Universal Robot e-series.
+    """
+    MESSAGE_HEADER = struct.Struct('!iB')
+    PACKAGE_HEADER = struct.Struct('!iB')
+    ROBOT_MODE_DATA = struct.Struct('!Q???????BBddd')
+    JOINT_DATA = struct.Struct('!' + 'dddffffB' * 6)
+    TOOL_DATA = struct.Struct('!bbddfBffB')
+    MASTERBOARD_DATA = struct.Struct('!iibbddbbddffffBBb')
+    MASTERBOARD_EUROMAP_DATA = struct.Struct('!IIff')
+    CARTESIAN_INFO = struct.Struct('!12d')
+    KINEMATICS_INFO = struct.Struct('!6I24dI')
+    CONFIGURATION_DATA = struct.Struct('!53d4i')
+    FORCE_MODE_DATA = struct.Struct('!7d')
+    ADDITIONAL_INFO = struct.Struct('!B??')
+    TOOL_COMM_INFO = struct.Struct('!?iiiff')
+    TOOL_MODE_INFO = struct.Struct('!BBB')
+    SINGULARITY_INFO = struct.Struct('!BB')
+    ROBOT_MESSAGE_HEADER = struct.Struct('!Qbb')
+    PROGRAM_LABEL_MESSAGE = struct.Struct('!i')
+    POPUP_MESSAGE = struct.Struct('!II???B')
+    VERSION_NAME_SIZE = struct.Struct('!b')
+    VERSION_MESSAGE = struct.Struct('!BBii')
+    SAFETY_MODE_MESSAGE = struct.Struct('!iiBII')
+    ERROR_CODE_MESSAGE = struct.Struct('!iiiBI')
+    KEY_MESSAGE = struct.Struct('!iiB')
+    REQUEST_VALUE_MESSAGE = struct.Struct('!II')
+    RUNTIME_EXCEPTION_MESSAGE = struct.Struct('!ii')
+
+
 class DataFormat(str, Enum):
     """
     Based on https://docs.python.org/3/library/struct.html
@@ -67,14 +116,6 @@ class SizeFormat(IntEnum):
     DOUBLE = 8
 
 
-"""
-class ControlModes(Enum):
-    CONTROL_MODE_POSITION = 0
-    CONTROL_MODE_TEACH = 1
-    CONTROL_MODE_FORCE = 2
-    CONTROL_MODE_TORQUE = 3
-
-
 class RobotModes(Enum):
     ROBOT_MODE_NO_CONTROLLER = -1
     ROBOT_MODE_DISCONNECTED = 0
@@ -88,6 +129,14 @@ class RobotModes(Enum):
     ROBOT_MODE_UPDATING_FIRMWARE = 8
 
 
+"""
+class ControlModes(Enum):
+    CONTROL_MODE_POSITION = 0
+    CONTROL_MODE_TEACH = 1
+    CONTROL_MODE_FORCE = 2
+    CONTROL_MODE_TORQUE = 3
+
+
 class JointModes(Enum):
     JOINT_MODE_RESET = 235
     JOINT_MODE_SHUTTING_DOWN = 236
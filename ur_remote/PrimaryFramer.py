@@ -0,0 +1,125 @@
+import struct
+from ur_remote.PrimaryEnum import PackageStruct
+
+MESSAGE_HEADER = PackageStruct.MESSAGE_HEADER
+MESSAGE_SIZE = struct.Struct('!i')
+BUFFER_SIZE = 65536
+RECV_SIZE = 4096
+# Largest message accepted, far above the few kilobytes of a ROBOT_STATE message
+MAX_MESSAGE_SIZE = 1 << 20
+
+
+class PrimaryFramer:
+    """
+    Reassemble the stream of the Primary Client into complete messages.
+
+    The controller does not align its messages on the recv() boundaries, a message can be split over several reads
+    and a single read can hold several messages. The framer keeps a persistent receive buffer, uses the leading
+    message size of each message to slice out the complete ones and keeps the remaining bytes for the next read.
+
+    The messages are yielded as memoryview slices of the receive buffer, without any copy. A message is only valid
+    until the next call of recvInto or feed, copy it with bytes() to keep it longer.
+
+    A message size below the header size or above maxMessageSize means that the stream is out of sync: the buffer
+    is then dropped and a ValueError raised, the stream has to be restarted from a message boundary by reconnecting.
+
+    :param bufferSize: initial size of the receive buffer in bytes, grown when a message does not fit in it
+    :type bufferSize: int
+    :param maxMessageSize: largest message size accepted in bytes
+    :type maxMessageSize: int
+    """
+
+    def __init__(self, bufferSize=BUFFER_SIZE, maxMessageSize=MAX_MESSAGE_SIZE):
+        self.maxMessageSize = maxMessageSize
+        self.buffer = bytearray(bufferSize)
+        self.view = memoryview(self.buffer)
+        self.start = 0
+        self.end = 0
+
+    def reset(self):
+        """
+        Drop the bytes kept in the buffer, to be called when the stream is restarted
+        """
+
+        self.start = 0
+        self.end = 0
+
+    def pending(self):
+        """
+        :return: The number of received bytes not yet yielded as a complete message
+        :rtype: int
+        """
+
+        return self.end - self.start
+
+    def recvInto(self, server):
+        """
+        Receive the available bytes of the socket directly in the buffer
+
+        :param server: connected socket of the Primary Client
+        :type server: socket.socket
+
+        :return: The number of bytes received, 0 when the connection has been closed
+        :rtype: int
+        """
+
+        self.__makeRoom(RECV_SIZE)
+        received = server.recv_into(self.view[self.end:])
+        self.end += received
+        return received
+
+    def feed(self, data):
+        """
+        Append bytes received by another mean than a socket
+
+        :param data: bytes of the stream
+        :type data: bytes-like object
+        """
+
+        self.__makeRoom(len(data))
+        self.view[self.end:self.end + len(data)] = data
+        self.end += len(data)
+
+    def messages(self):
+        """
+        Yield every complete message held in the buffer
+
+        :return: The complete messages, header included
+        :rtype: generator of memoryview
+        """
+
+        while self.end - self.start >= MESSAGE_HEADER.size:
+            messageSize = MESSAGE_SIZE.unpack_from(self.buffer, self.start)[0]
+            if messageSize < MESSAGE_HEADER.size or messageSize > self.maxMessageSize:
+                self.reset()
+                raise ValueError("Primary stream out of sync, invalid message size " + str(messageSize))
+            if self.end - self.start < messageSize:
+                break
+            message = self.view[self.start:self.start + messageSize]
+            self.start += messageSize
+            yield message
+
+    def __makeRoom(self, minimum=1):
+        pending = self.end - self.start
+        if pending == 0:
+            self.start = 0
+            self.end = 0
+
+        needed = minimum
+        if pending >= MESSAGE_SIZE.size:
+            messageSize = MESSAGE_SIZE.unpack_from(self.buffer, self.start)[0]
+            if messageSize <= self.maxMessageSize:
+                needed = max(needed, messageSize - pending)
+
+        if len(self.buffer) - self.end >= needed:
+            return
+
+        if pending + needed > len(self.buffer):
+            buffer = bytearray(max(2 * len(self.buffer), pending + needed))
+            buffer[0:pending] = self.view[self.start:self.end]
+            self.buffer = buffer
+            self.view = memoryview(buffer)
+        else:
+            self.view[0:pending] = self.view[self.start:self.end]
+        self.start = 0
+        self.end = pending
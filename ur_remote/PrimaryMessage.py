@@ -0,0 +1,29 @@
+"""
+Records of the ROBOT_MESSAGE messages decoded by the Primary Client, one per robot message type.
+Each record starts with the timestamp (controller time in microseconds) and the source of the message, the sources
+being listed by MessageSource in the Primary Client documentation of the Universal Robot e-series.
+"""
+from collections import namedtuple
+
+TextMessage = namedtuple('TextMessage', ['timestamp', 'source', 'text'])
+
+ProgramLabelMessage = namedtuple('ProgramLabelMessage', ['timestamp', 'source', 'id', 'text'])
+
+PopupMessage = namedtuple('PopupMessage', [
+    'timestamp', 'source', 'requestId', 'requestedType', 'warning', 'error', 'blocking', 'title', 'text'])
+
+VersionMessage = namedtuple('VersionMessage', [
+    'timestamp', 'source', 'projectName', 'majorVersion', 'minorVersion', 'bugfixVersion', 'buildNumber',
+    'buildDate'])
+
+SafetyModeMessage = namedtuple('SafetyModeMessage', [
+    'timestamp', 'source', 'code', 'argument', 'safetyModeType', 'reportDataType', 'reportData'])
+
+ErrorCodeMessage = namedtuple('ErrorCodeMessage', [
+    'timestamp', 'source', 'code', 'argument', 'reportLevel', 'dataType', 'data', 'text'])
+
+KeyMessage = namedtuple('KeyMessage', ['timestamp', 'source', 'code', 'argument', 'title', 'text'])
+
+RequestValueMessage = namedtuple('RequestValueMessage', ['timestamp', 'source', 'requestId', 'requestedType', 'text'])
+
+RuntimeExceptionMessage = namedtuple('RuntimeExceptionMessage', ['timestamp', 'source', 'line', 'column', 'text'])
@@ -0,0 +1,151 @@
+import mmap
+import os
+import struct
+import time
+from ur_remote.PrimaryEnum import PackageStruct
+
+MAGIC = b'URPRIM01'
+TIMESTAMP = struct.Struct('!d')
+BUFFER_SIZE = 1 << 20
+FLUSH_INTERVAL = 1.0
+
+
+class PrimaryRecorder:
+    """
+    Append the raw messages of the Primary Client to a binary log, each one preceded by its receive timestamp.
+
+    The records go through a large write buffer flushed periodically, so recording costs few system calls.
+    The log starts with the MAGIC bytes, then each record is a big-endian double timestamp (epoch time in seconds)
+    followed by the message as received, its header holding its size.
+
+    :param path: path of the log, appended when it exists
+    :type path: string
+    :param bufferSize: size of the write buffer in bytes
+    :type bufferSize: int
+    :param flushInterval: maximum time between two flushes in seconds
+    :type flushInterval: float
+    """
+
+    def __init__(self, path, bufferSize=BUFFER_SIZE, flushInterval=FLUSH_INTERVAL):
+        self.path = path
+        self.flushInterval = flushInterval
+        self.file = open(path, 'ab', buffering=bufferSize)
+        if self.file.tell() == 0:
+            self.file.write(MAGIC)
+        self.lastFlush = time.monotonic()
+        self.count = 0
+
+    def record(self, message, timestamp=None):
+        """
+        :param message: a complete message, header included
+        :type message: bytes-like object
+        :param timestamp: receive time of the message (epoch time in seconds), now by default
+        :type timestamp: float
+        """
+
+        self.file.write(TIMESTAMP.pack(time.time() if timestamp is None else timestamp))
+        self.file.write(message)
+        self.count += 1
+        now = time.monotonic()
+        if now - self.lastFlush >= self.flushInterval:
+            self.file.flush()
+            self.lastFlush = now
+
+    def flush(self):
+        self.file.flush()
+        self.lastFlush = time.monotonic()
+
+    def close(self):
+        self.file.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, excType, excValue, traceback):
+        self.close()
+
+
+class PrimaryReplay:
+    """
+    Read a log written by the PrimaryRecorder through a memory map, the messages are views on the mapped file
+    without any copy. A record truncated by a crash of the recorder ends the log.
+
+    :param path: path of the log
+    :type path: string
+    """
+
+    def __init__(self, path):
+        self.path = path
+        self.file = open(path, 'rb')
+        try:
+            # an empty file cannot be mapped, and a log shorter than its MAGIC is not a log
+            if os.fstat(self.file.fileno()).st_size < len(MAGIC):
+                raise ValueError(path + " is not a Primary log")
+            self.map = mmap.mmap(self.file.fileno(), 0, access=mmap.ACCESS_READ)
+        except (ValueError, OSError):
+            self.file.close()
+            raise ValueError(path + " is not a Primary log")
+        self.view = memoryview(self.map)
+        if self.view[0:len(MAGIC)] != MAGIC:
+            self.close()
+            raise ValueError(path + " is not a Primary log")
+
+    def messages(self):
+        """
+        :return: The receive timestamp and the message of each record, in the order of the log
+        :rtype: generator of tuple(float, memoryview)
+        """
+
+        view = self.view
+        end = len(view)
+        offset = len(MAGIC)
+        headerSize = TIMESTAMP.size + PackageStruct.MESSAGE_HEADER.size
+        while offset + headerSize <= end:
+            timestamp = TIMESTAMP.unpack_from(view, offset)[0]
+            offset += TIMESTAMP.size
+            messageSize = PackageStruct.MESSAGE_HEADER.unpack_from(view, offset)[0]
+            if messageSize < PackageStruct.MESSAGE_HEADER.size or offset + messageSize > end:
+                break
+            yield timestamp, view[offset:offset + messageSize]
+            offset += messageSize
+
+    def replay(self, primary, speed=None):
+        """
+        Feed the messages of the log through the decoders of a Primary, which does not need to be connected
+
+        :param primary: the Primary decoding the messages
+        :type primary: Primary
+        :param speed: replay speed relative to the recording, 1.0 for real time, as fast as possible by default
+        :type speed: float
+
+        :return: The number of messages replayed
+        :rtype: int
+        """
+
+        count = 0
+        start = None
+        for timestamp, message in self.messages():
+            if speed is not None:
+                if start is None:
+                    start = (timestamp, time.monotonic())
+                delay = (timestamp - start[0]) / speed - (time.monotonic() - start[1])
+                if delay > 0:
+                    time.sleep(delay)
+            primary.decode(message)
+            count += 1
+        return count
+
+    def close(self):
+        """
+        Unmap the log, the messages yielded before have to be released
+        """
+
+        self.view.release()
+        self.map.close()
+        self.file.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, excType, excValue, traceback):
+        self.close()
@@ -0,0 +1,148 @@
+"""
+Records of the ROBOT_STATE packages decoded by the Primary Client.
+They are named tuples, immutable and without per instance dictionary, to keep a large history of them in memory.
+The field names follow the Primary Client documentation of the Universal Robot e-series.
+"""
+from collections import namedtuple
+
+RobotModeData = namedtuple('RobotModeData', [
+    'timestamp', 'isRealRobotConnected', 'isRealRobotEnabled', 'isRobotPowerOn', 'isEmergencyStopped',
+    'isProtectiveStopped', 'isProgramRunning', 'isProgramPaused', 'robotMode', 'controlMode',
+    'targetSpeedFraction', 'speedScaling', 'targetSpeedFractionLimit'])
+
+JointData = namedtuple('JointData', [
+    'qActual', 'qTarget', 'qdActual', 'iActual', 'vActual', 'tMotor', 'tMicro', 'jointMode'])
+
+ToolData = namedtuple('ToolData', [
+    'analogInputRange0', 'analogInputRange1', 'analogInput0', 'analogInput1', 'toolVoltage48V',
+    'toolOutputVoltage', 'toolCurrent', 'toolTemperature', 'toolMode'])
+
+MasterboardData = namedtuple('MasterboardData', [
+    'digitalInputBits', 'digitalOutputBits', 'analogInputRange0', 'analogInputRange1', 'analogInput0',
+    'analogInput1', 'analogOutputDomain0', 'analogOutputDomain1', 'analogOutput0', 'analogOutput1',
+    'masterBoardTemperature', 'robotVoltage48V', 'robotCurrent', 'masterIOCurrent', 'safetyMode', 'inReducedMode',
+    'euromap67InterfaceInstalled', 'euromapInputBits', 'euromapOutputBits', 'euromapVoltage24V', 'euromapCurrent'],
+    defaults=(0, 0, 0.0, 0.0))
+
+CartesianInfo = namedtuple('CartesianInfo', [
+    'x', 'y', 'z', 'rx', 'ry', 'rz',
+    'tcpOffsetX', 'tcpOffsetY', 'tcpOffsetZ', 'tcpOffsetRx', 'tcpOffsetRy', 'tcpOffsetRz'])
+
+KinematicsInfo = namedtuple('KinematicsInfo', [
+    'checksum', 'dhTheta', 'dhA', 'dhD', 'dhAlpha', 'calibrationStatus'])
+
+ConfigurationData = namedtuple('ConfigurationData', [
+    'jointMinLimit', 'jointMaxLimit', 'jointMaxSpeed', 'jointMaxAcceleration',
+    'vJointDefault', 'aJointDefault', 'vToolDefault', 'aToolDefault', 'eqRadius',
+    'dhA', 'dhD', 'dhAlpha', 'dhTheta', 'masterboardVersion', 'controllerBoxType', 'robotType', 'robotSubType'])
+
+ForceModeData = namedtuple('ForceModeData', [
+    'fx', 'fy', 'fz', 'frx', 'fry', 'frz', 'robotDexterity'])
+
+AdditionalInfo = namedtuple('AdditionalInfo', [
+    'tpButtonState', 'freedriveButtonEnabled', 'ioEnabledFreedrive'])
+
+ToolCommInfo = namedtuple('ToolCommInfo', [
+    'toolCommunicationIsEnabled', 'baudRate', 'parity', 'stopBits', 'rxIdleChars', 'txIdleChars'])
+
+ToolModeInfo = namedtuple('ToolModeInfo', [
+    'outputMode', 'digitalOutputModeOutput0', 'digitalOutputModeOutput1'])
+
+SingularityInfo = namedtuple('SingularityInfo', [
+    'singularitySeverity', 'singularityType'])
+
+class LazyRecord:
+    """
+    Package kept as bytes until one of its fields is read, then decoded once and standing for its record:
+    its fields, indexes, iteration and comparison are the ones of the decoded record.
+
+    :param reader: function decoding the package, called with the bytes and the offset 0
+    :type reader: callable
+    :param data: the package, without its header
+    :type data: bytes
+    """
+    __slots__ = ('__reader', '__data', '__record')
+
+    def __init__(self, reader, data):
+        self.__reader = reader
+        self.__data = data
+        self.__record = None
+
+    def decode(self):
+        """
+        :return: The decoded record, like RobotModeData, or the tuple of JointData
+        """
+
+        record = self.__record
+        if record is None:
+            record = self.__record = self.__reader(self.__data, 0)
+            self.__reader = None
+            self.__data = None
+        return record
+
+    def isDecoded(self):
+        return self.__record is not None
+
+    def __getattr__(self, name):
+        return getattr(self.decode(), name)
+
+    def __getitem__(self, index):
+        return self.decode()[index]
+
+    def __iter__(self):
+        return iter(self.decode())
+
+    def __len__(self):
+        return len(self.decode())
+
+    def __eq__(self, other):
+        if isinstance(other, LazyRecord):
+            other = other.decode()
+        return self.decode() == other
+
+    def __hash__(self):
+        return hash(self.decode())
+
+    def __repr__(self):
+        return repr(self.decode())
+
+
+RobotState = namedtuple('RobotState', [
+    'robotModeData', 'jointData', 'toolData', 'masterboardData', 'cartesianInfo', 'kinematicsInfo',
+    'configurationData', 'forceModeData', 'additionalInfo', 'toolCommInfo', 'toolModeInfo', 'singularityInfo'],
+    defaults=(None,) * 12)
+RobotState.__doc__ = """
+Latest decoded package of each type, None until the package has been received.
+jointData is a tuple of six JointData, one per joint from the base to the wrist 3.
+"""
+
+
+def flattenState(state, packages=RobotState._fields):
+    """
+    Flatten the scalar fields of a state, the fields of the joints and the vectors being suffixed by their index
+
+    :param state: the state
+    :type state: RobotState
+    :param packages: names of the packages flattened, all of them by default
+    :type packages: tuple of string
+
+    :return: Pairs of field path, like "robotModeData.isProgramRunning" or "jointData.qActual.0", and value.
+        The packages not yet received are skipped.
+    :rtype: generator of tuple(string, value)
+    """
+
+    for package in packages:
+        record = getattr(state, package)
+        if record is None:
+            continue
+        if package == 'jointData':
+            for field in JointData._fields:
+                for joint, jointData in enumerate(record):
+                    yield package + '.' + field + '.' + str(joint), getattr(jointData, field)
+            continue
+        for field, value in zip(record._fields, record):
+            if isinstance(value, tuple):
+                for index, item in enumerate(value):
+                    yield package + '.' + field + '.' + str(index), item
+            else:
+                yield package + '.' + field, value
@@ -0,0 +1,390 @@
+import selectors
+import socket
+import struct
+import threading
+import time
+from collections import deque
+from concurrent.futures import Future
+
+SELECT_TIMEOUT = 0.5
+RECV_SIZE = 4096
+
+
+class PrimaryChannel:
+    """
+    Primary of the Reactor, its stream being decoded as soon as bytes are readable
+    """
+
+    def __init__(self, primary):
+        self.primary = primary
+        self.connection = primary.connection
+        self.lastReceived = time.monotonic()
+
+    def onConnected(self):
+        self.lastReceived = time.monotonic()
+
+    def onReadable(self):
+        try:
+            self.primary.readPort()
+        except BlockingIOError:
+            return
+        self.lastReceived = time.monotonic()
+
+    def onWritable(self):
+        pass
+
+    def wantsWrite(self):
+        return False
+
+    def nextDeadline(self):
+        # The controller streams continuously, a silence longer than the timeout of the socket means a dead stream
+        if self.connection.options.timeout is None:
+            return None
+        return self.lastReceived + self.connection.options.timeout
+
+    def fail(self, error):
+        pass
+
+
+class DashboardChannel:
+    """
+    Dashboard of the Reactor, its commands being queued, written when the socket is writable and answered in order
+    """
+
+    def __init__(self, dashboard):
+        self.dashboard = dashboard
+        self.connection = dashboard.connection
+        self.outgoing = bytearray()
+        self.pending = deque()
+
+    def onConnected(self):
+        pass
+
+    def send(self, command, future, deadline):
+        self.outgoing += (command + '\n').encode()
+        self.pending.append((future, deadline))
+
+    def onReadable(self):
+        try:
+            self.dashboard.buffer += self.connection.recv(RECV_SIZE)
+        except BlockingIOError:
+            return
+        buffer = self.dashboard.buffer
+        end = buffer.find(b'\n')
+        while end >= 0:
+            line = buffer[:end].decode()
+            del buffer[:end + 1]
+            if self.pending:
+                future, deadline = self.pending.popleft()
+                future.set_result(line)
+            end = buffer.find(b'\n')
+
+    def onWritable(self):
+        try:
+            sent = self.connection.send(self.outgoing)
+        except BlockingIOError:
+            return
+        del self.outgoing[:sent]
+
+    def wantsWrite(self):
+        return bool(self.outgoing)
+
+    def nextDeadline(self):
+        if not self.pending:
+            return None
+        return self.pending[0][1]
+
+    def fail(self, error):
+        self.outgoing.clear()
+        self.dashboard.buffer.clear()
+        while self.pending:
+            future, deadline = self.pending.popleft()
+            future.set_exception(error)
+
+
+class Reactor:
+    """
+    Drive the sockets of many robots from a single thread, waiting on all of them at once with a selector
+    (epoll, kqueue...). A cell of 20 robots then takes one thread instead of 40 blocking ones.
+
+    The stream of each Primary is decoded as soon as bytes arrive, so its state, its listeners, waitForState and
+    getMessage work as with its background reader. The dashboard commands are queued with submit and answered
+    through a Future. While a Dashboard belongs to the reactor, its blocking commands must not be used.
+    A Primary silent for the timeout of its socket options is reconnected. Each connection attempt runs in its own
+    helper thread and a failed attempt is rescheduled by the reactor with the backoff of the Connection, so an
+    unreachable controller never stalls the other robots.
+
+    :param timeout: maximum time of a wait on the sockets in seconds, bounding the reaction to a command timeout
+    :type timeout: float
+    """
+
+    def __init__(self, timeout=SELECT_TIMEOUT):
+        self.timeout = timeout
+        self.selector = selectors.DefaultSelector()
+        self.channels = {}
+        self.lastError = None
+        self.__registered = {}
+        self.__calls = deque()
+        self.__wakeReader, self.__wakeWriter = socket.socketpair()
+        self.__wakeReader.setblocking(False)
+        self.__wakeWriter.setblocking(False)
+        self.selector.register(self.__wakeReader, selectors.EVENT_READ, None)
+        # Next connection attempt of each channel waiting to reconnect, with the backoff before the following one
+        self.__retries = {}
+        self.__thread = None
+        self.__stopped = threading.Event()
+
+    def addRobot(self, robot):
+        """
+        :param robot: a robot whose Primary and Dashboard are driven by the reactor
+        :type robot: URRobot
+        """
+
+        self.addPrimary(robot.Primary)
+        self.addDashboard(robot.Dashboard)
+
+    def addPrimary(self, primary):
+        """
+        :param primary: a Primary driven by the reactor, connected now if it is not
+        :type primary: Primary
+        """
+
+        self.__call(lambda: self.__add(primary, PrimaryChannel(primary)))
+
+    def addDashboard(self, dashboard):
+        """
+        :param dashboard: a Dashboard driven by the reactor, connected now if it is not
+        :type dashboard: Dashboard
+        """
+
+        self.__call(lambda: self.__add(dashboard, DashboardChannel(dashboard)))
+
+    def remove(self, client):
+        """
+        Give a Primary or a Dashboard back to blocking use, its pending commands fail
+
+        :param client: a Primary or a Dashboard added to the reactor
+        :type client: Primary or Dashboard
+        """
+
+        def remove():
+            channel = self.channels.pop(client, None)
+            if channel is not None:
+                self.__retries.pop(channel, None)
+                self.__unregister(channel)
+                channel.fail(ConnectionError("Removed from the reactor"))
+
+        self.__call(remove)
+
+    def submit(self, dashboard, command, timeout=None):
+        """
+        Queue a command of a dashboard server, sent as soon as its socket is writable
+
+        :param dashboard: a Dashboard added to the reactor
+        :type dashboard: Dashboard
+        :param command: the command, like "robotmode"
+        :type command: string
+        :param timeout: time given to the feedback in seconds, the timeout of the connection by default
+        :type timeout: float
+
+        :return: The future feedback of the client, failing with ConnectionError or socket.timeout
+        :rtype: concurrent.futures.Future
+        """
+
+        future = Future()
+
+        def send():
+            channel = self.channels.get(dashboard)
+            if channel is None:
+                future.set_exception(KeyError("The dashboard of " + dashboard.ipAddress + " is not in the reactor"))
+                return
+            if channel not in self.__registered:
+                future.set_exception(ConnectionError("Not connected to " + dashboard.ipAddress))
+                return
+            commandTimeout = dashboard.connection.timeout if timeout is None else timeout
+            channel.send(command, future, None if commandTimeout is None else time.monotonic() + commandTimeout)
+            self.__updateEvents(channel)
+
+        self.__call(send)
+        return future
+
+    def start(self):
+        """
+        Run the reactor in a background thread
+        """
+
+        if self.__thread is not None and self.__thread.is_alive():
+            return
+        self.__stopped.clear()
+        self.__thread = threading.Thread(target=self.run, name="Reactor", daemon=True)
+        self.__thread.start()
+
+    def stop(self, timeout=None):
+        """
+        Stop the background thread, the robots staying connected
+
+        :param timeout: maximum time to wait for the thread in seconds, forever by default
+        :type timeout: float
+        """
+
+        self.__stopped.set()
+        self.__wake()
+        if self.__thread is not None:
+            self.__thread.join(timeout)
+
+    def close(self):
+        """
+        Stop the reactor and give every robot back to blocking use
+        """
+
+        self.stop()
+        for client in list(self.channels):
+            self.remove(client)
+        self.__runCalls()
+        self.selector.close()
+        self.__wakeReader.close()
+        self.__wakeWriter.close()
+
+    def run(self):
+        """
+        Run the reactor in this thread until stop is called
+        """
+
+        while not self.__stopped.is_set():
+            self.runOnce()
+
+    def runOnce(self, timeout=None):
+        """
+        Wait once for the sockets, then handle every readable or writable one and the queued calls
+
+        :param timeout: maximum time to wait in seconds, the timeout of the reactor by default
+        :type timeout: float
+        """
+
+        timeout = self.timeout if timeout is None else timeout
+        now = time.monotonic()
+        for channel in self.__registered:
+            deadline = channel.nextDeadline()
+            if deadline is not None:
+                timeout = max(0.0, min(timeout, deadline - now))
+        for attemptAt, backoff in self.__retries.values():
+            timeout = max(0.0, min(timeout, attemptAt - now))
+
+        for key, events in self.selector.select(timeout):
+            channel = key.data
+            if channel is None:
+                self.__drainWake()
+                continue
+            if channel not in self.__registered:
+                continue
+            try:
+                if events & selectors.EVENT_READ:
+                    channel.onReadable()
+                if events & selectors.EVENT_WRITE:
+                    channel.onWritable()
+                self.__updateEvents(channel)
+            except (ConnectionError, ValueError, struct.error) as error:
+                self.__lost(channel, error)
+
+        now = time.monotonic()
+        for channel in list(self.__registered):
+            deadline = channel.nextDeadline()
+            if deadline is not None and now >= deadline:
+                self.__lost(channel, socket.timeout("Nothing received from " + channel.connection.ipAddress + ":" +
+                                                    str(channel.connection.port) + " in time"))
+        for channel, (attemptAt, backoff) in list(self.__retries.items()):
+            if now >= attemptAt:
+                del self.__retries[channel]
+                self.__connect(channel, backoff)
+        self.__runCalls()
+
+    def __add(self, client, channel):
+        if client in self.channels:
+            return
+        self.channels[client] = channel
+        if channel.connection.isConnected():
+            self.__register(channel)
+        else:
+            self.__reconnect(channel)
+
+    def __register(self, channel):
+        server = channel.connection.server
+        server.setblocking(False)
+        self.__registered[channel] = server
+        self.selector.register(server, selectors.EVENT_READ, channel)
+        channel.onConnected()
+
+    def __unregister(self, channel):
+        server = self.__registered.pop(channel, None)
+        if server is None:
+            return
+        self.selector.unregister(server)
+        if channel.connection.server is server:
+            server.settimeout(channel.connection.timeout)
+
+    def __updateEvents(self, channel):
+        if channel not in self.__registered:
+            return
+        events = selectors.EVENT_READ
+        if channel.wantsWrite():
+            events |= selectors.EVENT_WRITE
+        self.selector.modify(self.__registered[channel], events, channel)
+
+    def __lost(self, channel, error):
+        self.lastError = error
+        self.__unregister(channel)
+        channel.connection.close()
+        channel.fail(error if isinstance(error, (ConnectionError, socket.timeout))
+                     else ConnectionError(str(error)))
+        self.__reconnect(channel)
+
+    def __reconnect(self, channel):
+        if self.__stopped.is_set():
+            return
+        self.__connect(channel, channel.connection.backoff)
+
+    def __connect(self, channel, backoff):
+        """
+        Make a single connection attempt in a helper thread, the reactor scheduling the next one after backoff seconds
+        if it fails
+        """
+
+        def connect():
+            error = None
+            try:
+                channel.connection.connect()
+            except Exception as failure:
+                error = failure
+            self.__call(lambda: self.__connected(channel, error, backoff))
+
+        threading.Thread(target=connect, name="Reactor connect " + channel.connection.ipAddress, daemon=True).start()
+
+    def __connected(self, channel, error, backoff):
+        if channel not in self.channels.values():
+            return
+        if error is not None:
+            self.lastError = error
+            self.__retries[channel] = (time.monotonic() + backoff, min(2 * backoff, channel.connection.maxBackoff))
+            return
+        self.__register(channel)
+
+    def __call(self, function):
+        self.__calls.append(function)
+        self.__wake()
+
+    def __runCalls(self):
+        while self.__calls:
+            self.__calls.popleft()()
+
+    def __wake(self):
+        try:
+            self.__wakeWriter.send(b'\0')
+        except OSError:
+            pass
+
+    def __drainWake(self):
+        try:
+            while self.__wakeReader.recv(RECV_SIZE):
+                pass
+        except BlockingIOError:
+            pass
@@ -0,0 +1,230 @@
+import os
+import struct
+import time
+from multiprocessing import shared_memory
+from ur_remote.PrimaryState import RobotState
+from ur_remote.PrimaryState import RobotModeData
+from ur_remote.PrimaryState import JointData
+from ur_remote.PrimaryState import ToolData
+from ur_remote.PrimaryState import MasterboardData
+from ur_remote.PrimaryState import CartesianInfo
+from ur_remote.PrimaryState import KinematicsInfo
+from ur_remote.PrimaryState import ConfigurationData
+from ur_remote.PrimaryState import ForceModeData
+from ur_remote.PrimaryState import AdditionalInfo
+from ur_remote.PrimaryState import ToolCommInfo
+from ur_remote.PrimaryState import ToolModeInfo
+from ur_remote.PrimaryState import SingularityInfo
+
+MAGIC = b'URSTATE1'
+SEQUENCE = struct.Struct('=Q')
+INFO = struct.Struct('=dI')
+SEQUENCE_OFFSET = len(MAGIC)
+INFO_OFFSET = SEQUENCE_OFFSET + SEQUENCE.size
+READ_RETRIES = 1000
+# Names of the shared memories created by this process, or by the process it has been forked from
+PUBLISHED = set()
+
+
+class PackageLayout:
+    """
+    Fixed layout of a package in the shared memory, in the native byte order of the host
+
+    :param struct: layout of the values
+    :type struct: struct.Struct
+    :param toValues: function flattening the record into the values
+    :type toValues: callable
+    :param fromValues: function building the record from the values
+    :type fromValues: callable
+    """
+
+    def __init__(self, struct, toValues, fromValues):
+        self.struct = struct
+        self.toValues = toValues
+        self.fromValues = fromValues
+
+
+def recordLayout(record, format):
+    return PackageLayout(struct.Struct('=' + format), tuple, record._make)
+
+
+PACKAGE_LAYOUTS = (
+    ('robotModeData', recordLayout(RobotModeData, 'Q???????BBddd')),
+    ('jointData', PackageLayout(
+        struct.Struct('=' + 'dddffffB' * 6),
+        lambda joints: tuple([value for joint in joints for value in joint]),
+        lambda values: tuple([JointData._make(values[joint:joint + 8]) for joint in range(0, 48, 8)]))),
+    ('toolData', recordLayout(ToolData, 'bbddfBffB')),
+    ('masterboardData', recordLayout(MasterboardData, 'iibbddbbddffffBBbIIff')),
+    ('cartesianInfo', recordLayout(CartesianInfo, '12d')),
+    ('kinematicsInfo', PackageLayout(
+        struct.Struct('=6I24dI'),
+        lambda record: (*record.checksum, *record.dhTheta, *record.dhA, *record.dhD, *record.dhAlpha,
+                        record.calibrationStatus),
+        lambda values: KinematicsInfo(values[0:6], values[6:12], values[12:18], values[18:24], values[24:30],
+                                      values[30]))),
+    ('configurationData', PackageLayout(
+        struct.Struct('=24d5d24d4i'),
+        lambda record: (*record.jointMinLimit, *record.jointMaxLimit, *record.jointMaxSpeed,
+                        *record.jointMaxAcceleration, record.vJointDefault, record.aJointDefault,
+                        record.vToolDefault, record.aToolDefault, record.eqRadius, *record.dhA, *record.dhD,
+                        *record.dhAlpha, *record.dhTheta, record.masterboardVersion, record.controllerBoxType,
+                        record.robotType, record.robotSubType),
+        lambda values: ConfigurationData(values[0:6], values[6:12], values[12:18], values[18:24], *values[24:29],
+                                         values[29:35], values[35:41], values[41:47], values[47:53],
+                                         *values[53:57]))),
+    ('forceModeData', recordLayout(ForceModeData, '7d')),
+    ('additionalInfo', recordLayout(AdditionalInfo, 'B??')),
+    ('toolCommInfo', recordLayout(ToolCommInfo, '?iiiff')),
+    ('toolModeInfo', recordLayout(ToolModeInfo, 'BBB')),
+    ('singularityInfo', recordLayout(SingularityInfo, 'BB')),
+)
+
+
+def layoutOffsets():
+    """
+    :return: The offset of each package in the shared memory, and the size of the shared memory
+    :rtype: tuple(list of int, int)
+    """
+
+    offsets = []
+    offset = INFO_OFFSET + INFO.size
+    for name, layout in PACKAGE_LAYOUTS:
+        offsets.append(offset)
+        offset += layout.struct.size
+    return offsets, offset
+
+
+class SharedStatePublisher:
+    """
+    Publish the latest state of a Primary in a shared memory, read by any process of the host with a
+    SharedStateReader. A single connection to the controller then serves every process.
+
+    The packages are written with fixed layouts, guarded by a sequence number made odd during each write
+    (seqlock): the readers never lock the writer, and retry when they read during a write.
+    Feed it from a Primary with primary.addStateListener(publisher.publish).
+
+    :param name: name of the shared memory, a unique name is chosen by default
+    :type name: string
+    :param packages: names of the RobotState packages published, all of them by default
+    :type packages: tuple of string
+    """
+
+    def __init__(self, name=None, packages=RobotState._fields):
+        offsets, size = layoutOffsets()
+        self.memory = shared_memory.SharedMemory(name, create=True, size=size)
+        self.name = self.memory.name
+        PUBLISHED.add(self.name)
+        self.sequence = 0
+        self.__layouts = [(1 << index, name, layout, offsets[index])
+                          for index, (name, layout) in enumerate(PACKAGE_LAYOUTS) if name in packages]
+        self.memory.buf[0:len(MAGIC)] = MAGIC
+        SEQUENCE.pack_into(self.memory.buf, SEQUENCE_OFFSET, self.sequence)
+        INFO.pack_into(self.memory.buf, INFO_OFFSET, 0.0, 0)
+
+    def publish(self, state):
+        """
+        :param state: the state published
+        :type state: RobotState
+        """
+
+        buffer = self.memory.buf
+        SEQUENCE.pack_into(buffer, SEQUENCE_OFFSET, self.sequence + 1)
+        present = 0
+        for bit, name, layout, offset in self.__layouts:
+            record = getattr(state, name)
+            if record is not None:
+                layout.struct.pack_into(buffer, offset, *layout.toValues(record))
+                present |= bit
+        INFO.pack_into(buffer, INFO_OFFSET, time.time(), present)
+        self.sequence += 2
+        SEQUENCE.pack_into(buffer, SEQUENCE_OFFSET, self.sequence)
+
+    def close(self):
+        """
+        Close and remove the shared memory, the readers keep their mapping until they close it
+        """
+
+        self.memory.close()
+        self.memory.unlink()
+        PUBLISHED.discard(self.name)
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, excType, excValue, traceback):
+        self.close()
+
+
+class SharedStateReader:
+    """
+    Read the state published by a SharedStatePublisher of another process, without any socket.
+    The packages are unpacked directly from the shared memory, then kept only if no write happened meanwhile.
+
+    :param name: name of the shared memory, the name of the publisher
+    :type name: string
+    """
+
+    def __init__(self, name):
+        self.name = name
+        self.memory = self.__attach(name)
+        if bytes(self.memory.buf[0:len(MAGIC)]) != MAGIC:
+            self.memory.close()
+            raise ValueError(name + " is not a shared state")
+        offsets, size = layoutOffsets()
+        self.__layouts = [(1 << index, name, layout, offsets[index])
+                          for index, (name, layout) in enumerate(PACKAGE_LAYOUTS)]
+
+    @staticmethod
+    def __attach(name):
+        try:
+            return shared_memory.SharedMemory(name, track=False)
+        except TypeError:
+            # Before Python 3.13 the resource tracker of this process would remove the memory of the publisher at exit,
+            # unless it is the tracker of the publisher, shared with the processes forked from it
+            memory = shared_memory.SharedMemory(name)
+            if os.name == 'posix' and name not in PUBLISHED:
+                from multiprocessing import resource_tracker
+                resource_tracker.unregister(memory._name, 'shared_memory')
+            return memory
+
+    def read(self, retries=READ_RETRIES):
+        """
+        :param retries: number of attempts while the publisher is writing
+        :type retries: int
+
+        :return: The number of states published, the publish time (epoch time in seconds) and the latest state
+        :rtype: tuple(int, float, RobotState)
+        """
+
+        buffer = self.memory.buf
+        for attempt in range(retries):
+            sequence = SEQUENCE.unpack_from(buffer, SEQUENCE_OFFSET)[0]
+            if sequence & 1:
+                time.sleep(0)
+                continue
+            timestamp, present = INFO.unpack_from(buffer, INFO_OFFSET)
+            packages = {}
+            for bit, name, layout, offset in self.__layouts:
+                if present & bit:
+                    packages[name] = layout.fromValues(layout.struct.unpack_from(buffer, offset))
+            if SEQUENCE.unpack_from(buffer, SEQUENCE_OFFSET)[0] == sequence:
+                return sequence // 2, timestamp, RobotState(**packages)
+        raise TimeoutError("The shared state " + self.name + " is being written continuously")
+
+    def getState(self):
+        """
+        :return: The latest state published
+        :rtype: RobotState
+        """
+
+        return self.read()[2]
+
+    def close(self):
+        self.memory.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, excType, excValue, traceback):
+        self.close()
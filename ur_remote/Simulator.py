@@ -0,0 +1,479 @@
+import math
+import socket
+import threading
+import time
+from collections import deque
+from ur_remote.Dashboard import RobotMode
+from ur_remote.PrimaryEnum import MESSAGE_TYPE
+from ur_remote.PrimaryEnum import RobotModes
+from ur_remote.PrimaryEnum import ROBOT_STATE_PACKAGE_TYPE
+from ur_remote.PrimaryEnum import ROBOT_MESSAGE_TYPE
+from ur_remote.PrimaryEnum import PackageStruct
+
+RATE = 10.0
+PROGRAM_DURATION = 1.0
+POWER_DELAY = 0.2
+CHUNK_DELAY = 0.001
+ACCEPT_TIMEOUT = 0.1
+GREETING = "Connected: Universal Robots Dashboard Server"
+ROBOT_MODEL = "UR5"
+SERIAL_NUMBER = "20235500001"
+POLYSCOPE_VERSION = "URSoftware 5.11.1.108318 (Jul 06 2021)"
+MESSAGE_SOURCE_ROBOTINTERFACE = -2
+MESSAGE_SOURCE_CONTROLLER = 7
+
+
+class SimulatedController:
+    """
+    Stand-in of a Universal Robot controller listening on localhost, to run the library, its tests and its
+    benchmarks without a robot.
+
+    The dashboard server answers the commands used by the library, like load, play, robotmode or running, and powers
+    on the robot and runs the loaded program in simulated time. The primary client streams ROBOT_STATE messages
+    with the package layouts of the e-series at a fixed rate, the joints moving while a program runs.
+    Latency, partial writes and disconnections of the network can be simulated.
+
+    The ports are chosen by the system by default, the robot is then created with
+    URRobot("127.0.0.1", dashboardPort=controller.dashboardPort, primaryPort=controller.primaryPort).
+
+    :param host: the ip address listened
+    :type host: string
+    :param dashboardPort: the port of the dashboard server, 0 for a free port
+    :type dashboardPort: int
+    :param primaryPort: the port of the primary client, 0 for a free port
+    :type primaryPort: int
+    :param rate: number of ROBOT_STATE messages sent per second on each primary connection
+    :type rate: float
+    :param latency: delay before each answer of the dashboard server and each message of the primary client, in seconds
+    :type latency: float
+    :param chunkSize: size of the writes in bytes, each answer and message being split in several writes, None to send them at once
+    :type chunkSize: int
+    :param programDuration: time a program runs once played, in seconds
+    :type programDuration: float
+    :param powerDelay: time taken by the power on and by the brake release, in seconds
+    :type powerDelay: float
+    :param remoteControl: answer of "is in remote control"
+    :type remoteControl: boolean
+    """
+
+    def __init__(self, host='127.0.0.1', dashboardPort=0, primaryPort=0, rate=RATE, latency=0.0, chunkSize=None,
+                 programDuration=PROGRAM_DURATION, powerDelay=POWER_DELAY, remoteControl=True):
+        self.host = host
+        self.dashboardPort = dashboardPort
+        self.primaryPort = primaryPort
+        self.rate = rate
+        self.latency = latency
+        self.chunkSize = chunkSize
+        self.programDuration = programDuration
+        self.powerDelay = powerDelay
+        self.remoteControl = remoteControl
+        self.robotMode = RobotMode.POWER_OFF
+        self.loadedProgram = None
+        self.programStartedAt = None
+        self.programPausedAt = None
+        self.commands = []
+        self.__transition = None
+        self.__lock = threading.Lock()
+        self.__stopped = threading.Event()
+        self.__listeners = []
+        self.__clients = set()
+        self.__outboxes = []
+        self.__threads = []
+
+    def start(self):
+        """
+        Listen on the dashboard and the primary ports, the ports chosen by the system are then set
+
+        :return: The controller
+        :rtype: SimulatedController
+        """
+
+        self.__stopped.clear()
+        dashboard = self.__listen(self.dashboardPort)
+        primary = self.__listen(self.primaryPort)
+        self.dashboardPort = dashboard.getsockname()[1]
+        self.primaryPort = primary.getsockname()[1]
+        self.__spawn(self.__accept, dashboard, self.__serveDashboard)
+        self.__spawn(self.__accept, primary, self.__servePrimary)
+        return self
+
+    def stop(self):
+        """
+        Close the listening sockets and every connection
+        """
+
+        self.__stopped.set()
+        for listener in self.__listeners:
+            listener.close()
+        self.__listeners = []
+        self.disconnect()
+        for thread in self.__threads:
+            thread.join()
+        self.__threads = []
+
+    def disconnect(self):
+        """
+        Drop every open connection, like a network failure, while still accepting new connections
+        """
+
+        with self.__lock:
+            clients = list(self.__clients)
+            self.__clients.clear()
+        for client in clients:
+            try:
+                client.shutdown(socket.SHUT_RDWR)
+            except OSError:
+                pass
+            client.close()
+
+    def sendRobotMessage(self, robotMessageType, body, source=MESSAGE_SOURCE_CONTROLLER):
+        """
+        Send a ROBOT_MESSAGE on every primary connection, before their next ROBOT_STATE message
+
+        :param robotMessageType: the type of the robot message
+        :type robotMessageType: ROBOT_MESSAGE_TYPE
+        :param body: the fields following the robotMessageType, laid out with PackageStruct
+        :type body: bytes
+        :param source: the source of the message
+        :type source: int
+        """
+
+        message = self.robotMessage(robotMessageType, body, source)
+        with self.__lock:
+            for outbox in self.__outboxes:
+                outbox.append(message)
+
+    @staticmethod
+    def robotMessage(robotMessageType, body, source=MESSAGE_SOURCE_CONTROLLER):
+        """
+        :return: A ROBOT_MESSAGE, header included
+        :rtype: bytes
+        """
+
+        body = PackageStruct.ROBOT_MESSAGE_HEADER.pack(int(time.monotonic() * 1000000), source,
+                                                       robotMessageType) + body
+        return PackageStruct.MESSAGE_HEADER.pack(PackageStruct.MESSAGE_HEADER.size + len(body),
+                                                 MESSAGE_TYPE.ROBOT_MESSAGE) + body
+
+    def isProgramRunning(self):
+        """
+        :return: True if the played program has not yet finished
+        :rtype: boolean
+        """
+
+        with self.__lock:
+            self.__update()
+            return self.programStartedAt is not None
+
+    def __enter__(self):
+        return self.start()
+
+    def __exit__(self, excType, excValue, traceback):
+        self.stop()
+
+    def __listen(self, port):
+        listener = socket.socket(socket.AF_INET, socket.SOCK_STREAM)
+        listener.setsockopt(socket.SOL_SOCKET, socket.SO_REUSEADDR, 1)
+        listener.bind((self.host, port))
+        listener.listen()
+        listener.settimeout(ACCEPT_TIMEOUT)
+        self.__listeners.append(listener)
+        return listener
+
+    def __spawn(self, target, *args):
+        thread = threading.Thread(target=target, args=args, daemon=True)
+        thread.start()
+        self.__threads.append(thread)
+
+    def __accept(self, listener, serve):
+        while not self.__stopped.is_set():
+            try:
+                client, address = listener.accept()
+            except socket.timeout:
+                continue
+            except OSError:
+                return
+            client.settimeout(None)
+            client.setsockopt(socket.IPPROTO_TCP, socket.TCP_NODELAY, 1)
+            with self.__lock:
+                self.__clients.add(client)
+            threading.Thread(target=self.__serve, args=(serve, client), daemon=True).start()
+
+    def __serve(self, serve, client):
+        try:
+            serve(client)
+        except OSError:
+            pass
+        finally:
+            with self.__lock:
+                self.__clients.discard(client)
+            client.close()
+
+    def __send(self, client, data):
+        if self.latency:
+            time.sleep(self.latency)
+        if self.chunkSize is None:
+            client.sendall(data)
+            return
+        for start in range(0, len(data), self.chunkSize):
+            client.sendall(data[start:start + self.chunkSize])
+            time.sleep(CHUNK_DELAY)
+
+    # Dashboard server
+
+    def __serveDashboard(self, client):
+        self.__send(client, (GREETING + "\n").encode())
+        buffer = b''
+        while not self.__stopped.is_set():
+            data = client.recv(4096)
+            if not data:
+                return
+            buffer += data
+            while b'\n' in buffer:
+                line, buffer = buffer.split(b'\n', 1)
+                command = line.decode().strip()
+                if not command:
+                    continue
+                reply = self.__answer(command)
+                self.__send(client, (reply + "\n").encode())
+                if command == "quit":
+                    return
+
+    def __answer(self, command):
+        with self.__lock:
+            self.commands.append(command)
+            self.__update()
+            return self.__answerLocked(command)
+
+    def __answerLocked(self, command):
+        now = time.monotonic()
+        if command.startswith("load ") and command.endswith(".urp"):
+            if self.programStartedAt is not None:
+                return "Error while loading program: program is running"
+            self.loadedProgram = "/programs/" + command[5:]
+            return "Loading program: " + self.loadedProgram
+        if command.startswith("load ") and command.endswith(".installation"):
+            return "Loading installation: " + command[5:]
+        if command == "play":
+            if self.loadedProgram is None or self.robotMode != RobotMode.RUNNING:
+                return "Failed to execute: play"
+            if self.programPausedAt is not None:
+                self.programStartedAt += now - self.programPausedAt
+                self.programPausedAt = None
+            elif self.programStartedAt is None:
+                self.programStartedAt = now
+            return "Starting program"
+        if command == "stop":
+            if self.programStartedAt is None:
+                return "Failed to execute: stop"
+            self.programStartedAt = None
+            self.programPausedAt = None
+            return "Stopped"
+        if command == "pause":
+            if self.programStartedAt is None or self.programPausedAt is not None:
+                return "Failed to execute: pause"
+            self.programPausedAt = now
+            return "Pausing program"
+        if command == "quit":
+            return "Disconnected"
+        if command == "shutdown":
+            return "Shutting down"
+        if command == "running":
+            return "Program running: " + ("true" if self.__isRunning() else "false")
+        if command == "robotmode":
+            return "Robotmode: " + self.robotMode.name
+        if command == "get loaded program":
+            if self.loadedProgram is None:
+                return "No program loaded"
+            return "Loaded program: " + self.loadedProgram
+        if command == "programState":
+            if self.programStartedAt is None:
+                return "STOPPED " + self.__loadedProgramName()
+            if self.programPausedAt is not None:
+                return "PAUSED " + self.__loadedProgramName()
+            return "PLAYING " + self.__loadedProgramName()
+        if command == "isProgramSaved":
+            return "true " + self.__loadedProgramName()
+        if command == "safetystatus":
+            return "Safetystatus: NORMAL"
+        if command == "is in remote control":
+            return "true" if self.remoteControl else "false"
+        if command == "get robot model":
+            return ROBOT_MODEL
+        if command == "get serial number":
+            return SERIAL_NUMBER
+        if command == "PolyscopeVersion":
+            return POLYSCOPE_VERSION
+        if command == "get operational mode":
+            return "NONE"
+        if command.startswith("set operational mode "):
+            return "Operational mode '" + command[21:] + "' is set"
+        if command == "clear operational mode":
+            return "No longer controlling the operational mode. Current operational mode: 'automatic'."
+        if command == "power on":
+            if self.robotMode == RobotMode.POWER_OFF:
+                self.robotMode = RobotMode.POWER_ON
+                self.__transition = (now + self.powerDelay, RobotMode.IDLE)
+            return "Powering on"
+        if command == "brake release":
+            if self.robotMode in (RobotMode.POWER_ON, RobotMode.IDLE):
+                self.__transition = (now + self.powerDelay, RobotMode.RUNNING)
+            return "Brake releasing"
+        if command == "power off":
+            self.robotMode = RobotMode.POWER_OFF
+            self.programStartedAt = None
+            self.programPausedAt = None
+            self.__transition = None
+            return "Powering off"
+        if command == "unlock protective stop":
+            return "Protective stop releasing"
+        if command == "close safety popup":
+            return "closing safety popup"
+        if command == "restart safety":
+            return "Restarting safety"
+        if command.startswith("popup "):
+            title = b'Popup'
+            self.__sendRobotMessageLocked(ROBOT_MESSAGE_TYPE.POPUP, PackageStruct.POPUP_MESSAGE.pack(
+                0, 0, False, False, False, len(title)) + title + command[6:].encode())
+            return "showing popup"
+        if command == "close popup":
+            return "closing popup"
+        if command.startswith("addToLog "):
+            return "Added log message"
+        if command.startswith("generate flight report"):
+            return "Flight Report generated with id: 0"
+        if command.startswith("generate support file "):
+            return "Completed successfully: ur_0.zip"
+        return "could not understand: '" + command + "'"
+
+    def __sendRobotMessageLocked(self, robotMessageType, body):
+        message = self.robotMessage(robotMessageType, body)
+        for outbox in self.__outboxes:
+            outbox.append(message)
+
+    def __update(self):
+        now = time.monotonic()
+        if self.__transition is not None and now >= self.__transition[0]:
+            self.robotMode = self.__transition[1]
+            self.__transition = None
+        if self.__isRunning() and now - self.programStartedAt >= self.programDuration:
+            self.programStartedAt = None
+
+    def __isRunning(self):
+        return self.programStartedAt is not None and self.programPausedAt is None
+
+    def __loadedProgramName(self):
+        if self.loadedProgram is None:
+            return ""
+        return self.loadedProgram.rsplit("/", 1)[-1]
+
+    # Primary client
+
+    def __servePrimary(self, client):
+        outbox = deque()
+        with self.__lock:
+            self.__outboxes.append(outbox)
+        try:
+            self.__streamPrimary(client, outbox)
+        finally:
+            with self.__lock:
+                self.__outboxes.remove(outbox)
+
+    def __streamPrimary(self, client, outbox):
+        self.__send(client, self.__versionMessage())
+        interval = 1.0 / self.rate
+        nextMessage = time.monotonic()
+        while not self.__stopped.is_set():
+            while outbox:
+                self.__send(client, outbox.popleft())
+            self.__send(client, self.robotStateMessage())
+            nextMessage += interval
+            delay = nextMessage - time.monotonic()
+            if delay > 0:
+                self.__stopped.wait(delay)
+            else:
+                nextMessage = time.monotonic()
+
+    def robotStateMessage(self):
+        """
+        Build a ROBOT_STATE message of the current simulated state, holding every package read by the Primary
+
+        :return: The message, header included
+        :rtype: bytes
+        """
+
+        with self.__lock:
+            self.__update()
+            robotMode = RobotModes['ROBOT_MODE_' + self.robotMode.name].value
+            running = self.__isRunning()
+            paused = self.programPausedAt is not None
+            elapsed = 0.0 if self.programStartedAt is None else time.monotonic() - self.programStartedAt
+        timestamp = int(time.monotonic() * 1000000)
+        powered = robotMode in (RobotModes.ROBOT_MODE_POWER_ON.value, RobotModes.ROBOT_MODE_IDLE.value,
+                                RobotModes.ROBOT_MODE_RUNNING.value)
+        q = [0.5 * math.sin(elapsed + joint) if running else 0.0 for joint in range(6)]
+        qd = [0.5 * math.cos(elapsed + joint) if running else 0.0 for joint in range(6)]
+
+        joints = []
+        for joint in range(6):
+            joints += [q[joint], q[joint], qd[joint], 0.1, 48.0, 33.0 + joint, 35.0, 253 if powered else 239]
+        pose = [0.1 + 0.1 * q[0], -0.4 + 0.1 * q[1], 0.3 + 0.1 * q[2], 2.2, -2.2, 0.0]
+
+        packages = [
+            (ROBOT_STATE_PACKAGE_TYPE.ROBOT_MODE_DATA, PackageStruct.ROBOT_MODE_DATA.pack(
+                timestamp, True, True, powered, False, False, running, paused, robotMode, 0, 1.0, 1.0, 1.0)),
+            (ROBOT_STATE_PACKAGE_TYPE.JOINT_DATA, PackageStruct.JOINT_DATA.pack(*joints)),
+            (ROBOT_STATE_PACKAGE_TYPE.TOOL_DATA, PackageStruct.TOOL_DATA.pack(
+                0, 0, 0.0, 0.0, 24.0, 0, 0.05, 32.0, 253)),
+            (ROBOT_STATE_PACKAGE_TYPE.MASTERBOARD_DATA, PackageStruct.MASTERBOARD_DATA.pack(
+                0, 0, 0, 0, 0.0, 0.0, 0, 0, 0.0, 0.0, 37.0, 48.0, 0.5, 0.1, 1, 0, 0)),
+            (ROBOT_STATE_PACKAGE_TYPE.CARTESIAN_INFO, PackageStruct.CARTESIAN_INFO.pack(*pose, *[0.0] * 6)),
+            (ROBOT_STATE_PACKAGE_TYPE.KINEMATICS_INFO, PackageStruct.KINEMATICS_INFO.pack(
+                *[0] * 6, *[0.0] * 6, 0.0, -0.425, -0.3922, 0.0, 0.0, 0.0, 0.1625, 0.0, 0.0, 0.1333, 0.0997, 0.0996,
+                math.pi / 2, 0.0, 0.0, math.pi / 2, -math.pi / 2, 0.0, 1)),
+            (ROBOT_STATE_PACKAGE_TYPE.CONFIGURATION_DATA, PackageStruct.CONFIGURATION_DATA.pack(
+                *[-2 * math.pi, 2 * math.pi] * 6, *[math.pi, 40.0] * 6, 1.05, 1.4, 0.25, 1.2, 0.0,
+                0.0, -0.425, -0.3922, 0.0, 0.0, 0.0, 0.1625, 0.0, 0.0, 0.1333, 0.0997, 0.0996,
+                math.pi / 2, 0.0, 0.0, math.pi / 2, -math.pi / 2, 0.0, *[0.0] * 6, 3, 2, 2, 0)),
+            (ROBOT_STATE_PACKAGE_TYPE.FORCE_MODE_DATA, PackageStruct.FORCE_MODE_DATA.pack(*[0.0] * 7)),
+            (ROBOT_STATE_PACKAGE_TYPE.ADDITIONAL_INFO, PackageStruct.ADDITIONAL_INFO.pack(0, False, False)),
+            (ROBOT_STATE_PACKAGE_TYPE.TOOL_COMM_INFO, PackageStruct.TOOL_COMM_INFO.pack(False, 115200, 0, 1, 1.5, 3.5)),
+            (ROBOT_STATE_PACKAGE_TYPE.TOOL_MODE_INFO, PackageStruct.TOOL_MODE_INFO.pack(0, 0, 0)),
+            (ROBOT_STATE_PACKAGE_TYPE.SINGULARITY_INFO, PackageStruct.SINGULARITY_INFO.pack(0, 0)),
+        ]
+
+        body = b''.join(PackageStruct.PACKAGE_HEADER.pack(PackageStruct.PACKAGE_HEADER.size + len(package),
+                                                          packageType) + package
+                        for packageType, package in packages)
+        return PackageStruct.MESSAGE_HEADER.pack(PackageStruct.MESSAGE_HEADER.size + len(body),
+                                                 MESSAGE_TYPE.ROBOT_STATE) + body
+
+    def __versionMessage(self):
+        projectName = b'URControl'
+        return self.robotMessage(ROBOT_MESSAGE_TYPE.VERSION, PackageStruct.VERSION_NAME_SIZE.pack(len(projectName)) +
+                                 projectName + PackageStruct.VERSION_MESSAGE.pack(5, 11, 1, 108318) +
+                                 b'06-07-2021, 12:00:00', MESSAGE_SOURCE_ROBOTINTERFACE)
+
+
+if __name__ == '__main__':
+    import argparse
+
+    parser = argparse.ArgumentParser(description="Simulated Universal Robot controller")
+    parser.add_argument('--host', default='127.0.0.1')
+    parser.add_argument('--dashboard-port', type=int, default=29999)
+    parser.add_argument('--primary-port', type=int, default=30011)
+    parser.add_argument('--rate', type=float, default=RATE)
+    parser.add_argument('--latency', type=float, default=0.0)
+    parser.add_argument('--chunk-size', type=int, default=None)
+    parser.add_argument('--program-duration', type=float, default=PROGRAM_DURATION)
+    arguments = parser.parse_args()
+
+    controller = SimulatedController(arguments.host, arguments.dashboard_port, arguments.primary_port, arguments.rate,
+                                     arguments.latency, arguments.chunk_size, arguments.program_duration)
+    with controller:
+        print("Dashboard server on " + arguments.host + ":" + str(controller.dashboardPort) +
+              ", primary client on " + arguments.host + ":" + str(controller.primaryPort))
+        try:
+            threading.Event().wait()
+        except KeyboardInterrupt:
+            pass
@@ -0,0 +1,135 @@
+import time
+from array import array
+from ur_remote.PrimaryState import flattenState
+
+try:
+    import numpy
+except ImportError:
+    numpy = None
+
+try:
+    import pyarrow
+    import pyarrow.parquet
+except ImportError:
+    pyarrow = None
+
+PACKAGES = ('robotModeData', 'jointData', 'toolData', 'cartesianInfo')
+
+
+class StateHistory:
+    """
+    History of the decoded states stored column by column, each field being appended to its own growable typed
+    array instead of keeping one object per state. Days of states then take megabytes instead of gigabytes, and the
+    columns can be queried at once with NumPy.
+
+    The columns are named after the field paths of flattenState, like "jointData.tMotor.0", plus a "time" column
+    holding the time of each row (epoch time in seconds). A row is appended once every recorded package has been
+    received. Feed it from a Primary with primary.addStateListener(history.append).
+
+    :param packages: names of the RobotState packages recorded
+    :type packages: tuple of string
+    """
+
+    def __init__(self, packages=PACKAGES):
+        self.packages = tuple(packages)
+        self.columns = {}
+        self.booleans = set()
+        self.count = 0
+
+    def append(self, state, timestamp=None):
+        """
+        :param state: the state appended as a new row
+        :type state: RobotState
+        :param timestamp: time of the state (epoch time in seconds), now by default
+        :type timestamp: float
+
+        :return: True if the row has been appended, False if a recorded package has not yet been received
+        :rtype: boolean
+        """
+
+        for package in self.packages:
+            if getattr(state, package) is None:
+                return False
+
+        if not self.columns:
+            self.__createColumns(state)
+        columns = self.columns
+        columns['time'].append(time.time() if timestamp is None else timestamp)
+        for name, value in flattenState(state, self.packages):
+            columns[name].append(value)
+        self.count += 1
+        return True
+
+    def __createColumns(self, state):
+        self.columns['time'] = array('d')
+        for name, value in flattenState(state, self.packages):
+            if isinstance(value, bool):
+                self.booleans.add(name)
+                self.columns[name] = array('b')
+            elif isinstance(value, int):
+                self.columns[name] = array('q')
+            else:
+                self.columns[name] = array('d')
+
+    def column(self, name):
+        """
+        :param name: name of the column, like "robotModeData.isProgramRunning" or "jointData.qActual.0"
+        :type name: string
+
+        :return: The values of the column, from the oldest to the newest
+        :rtype: array.array
+        """
+
+        return self.columns[name]
+
+    def clear(self):
+        """
+        Drop every row, keeping the columns
+        """
+
+        for name in self.columns:
+            del self.columns[name][:]
+        self.count = 0
+
+    def toNumpy(self):
+        """
+        :return: A copy of every column as a NumPy array, the boolean columns with the bool dtype
+        :rtype: dict of numpy.ndarray
+        """
+
+        if numpy is None:
+            raise ImportError("NumPy is required to export the history, pip install ur-remote[numpy]")
+
+        arrays = {}
+        for name, column in self.columns.items():
+            values = numpy.frombuffer(column, dtype=column.typecode).copy()
+            arrays[name] = values.astype(bool) if name in self.booleans else values
+        return arrays
+
+    def saveNpz(self, path):
+        """
+        Save the columns in a compressed .npz archive, one array per column
+
+        :param path: path of the archive
+        :type path: string
+        """
+
+        arrays = self.toNumpy()
+        numpy.savez_compressed(path, **arrays)
+
+    def saveParquet(self, path):
+        """
+        Save the columns in a Parquet file
+
+        :param path: path of the file
+        :type path: string
+        """
+
+        if pyarrow is None:
+            raise ImportError("pyarrow is required to export the history to Parquet, pip install ur-remote[arrow]")
+
+        table = {}
+        for name, column in self.columns.items():
+            values = pyarrow.array(column.tolist() if numpy is None else numpy.frombuffer(column, column.typecode))
+            table[name] = values.cast(pyarrow.bool_()) if name in self.booleans else values
+        pyarrow.parquet.write_table(pyarrow.table(table), path)
@@ -1,6 +1,22 @@
+import time
+from concurrent.futures import ThreadPoolExecutor
 from ur_remote.Dashboard import RobotMode
 from ur_remote.Dashboard import Dashboard
+from ur_remote.Dashboard import DASHBOARD_PORT
 from ur_remote.Primary import Primary
+from ur_remote.Primary import PRIMARY_PORT
+from ur_remote.PrimaryEnum import RobotModes
+from ur_remote.Connection import COMMAND_PROFILE
+from ur_remote.Connection import STREAM_PROFILE
+from ur_remote.Metrics import RUN_PROGRAM_PHASE
+
+POLL_INTERVAL = 0.05
+MAX_POLL_INTERVAL = 1.0
+# Directory of the programs on the controller, where the dashboard server resolves a relative program name
+PROGRAMS_DIRECTORY = "/programs/"
+# States awaited after the play for the program to be seen running, before enquiring the dashboard server,
+# and polls of the dashboard server reporting the program stopped before it is taken as finished
+PROGRAM_START_STATES = 2
 
 
 class URRobot:
@@ -11,36 +27,299 @@ class URRobot:
 
     :param ipAddress: the ip address of the Universal Robot..
     :type ipAddress: string
+    :param backgroundReader: start the background reader of the Primary Client, the robot is then awaited from the state it pushes instead of polling the dashboard server
+    :type backgroundReader: boolean
+    :param pollInterval: first time between two dashboard enquiries while waiting for the robot, in seconds
+    :type pollInterval: float
+    :param maxPollInterval: the time between two enquiries doubles up to this value, in seconds
+    :type maxPollInterval: float
+    :param lazy: do not connect now, each channel is then connected when first used and the remote control is checked by the first command of the robot
+    :type lazy: boolean
+    :param dashboardOptions: tuning of the dashboard socket, COMMAND_PROFILE by default
+    :type dashboardOptions: SocketOptions
+    :param primaryOptions: tuning of the primary socket, STREAM_PROFILE by default
+    :type primaryOptions: SocketOptions
+    :param dashboardPort: the port of the dashboard server
+    :type dashboardPort: int
+    :param primaryPort: the port of the primary client
+    :type primaryPort: int
+    :param metrics: optional callback given to the Dashboard and the Primary, also measuring the phases of runProgram, see MetricsCollector
+    :type metrics: callable
     """
 
-    def __init__(self, ipAddress):
+    def __init__(self, ipAddress, backgroundReader=False, pollInterval=POLL_INTERVAL,
+                 maxPollInterval=MAX_POLL_INTERVAL, lazy=False, dashboardOptions=COMMAND_PROFILE,
+                 primaryOptions=STREAM_PROFILE, dashboardPort=DASHBOARD_PORT, primaryPort=PRIMARY_PORT,
+                 metrics=None):
         self.ipAddress = ipAddress
-        self.Dashboard = Dashboard(ipAddress)
-        self.Primary = Primary(ipAddress)
+        self.metrics = metrics
+        self.pollInterval = pollInterval
+        self.maxPollInterval = maxPollInterval
+        self.loadedProgram = None
+        self.__loadedPath = None
+        self.__loadedConnection = None
+        self.Dashboard = Dashboard(ipAddress, dashboardOptions, dashboardPort, metrics)
+        self.Primary = Primary(ipAddress, options=primaryOptions, port=primaryPort, metrics=metrics)
+        self.__inRemoteControl = False
+
+        if not lazy:
+            self.connect()
+        if backgroundReader:
+            self.Primary.startReader()
+
+    def connect(self):
+        """
+        Connect the dashboard server and the primary client at the same time, then check the remote control
+        """
 
-        self.Dashboard.connect()
-        self.Primary.connect()
+        with ThreadPoolExecutor(max_workers=1) as executor:
+            primary = executor.submit(self.Primary.connect)
+            self.Dashboard.connect()
+            primary.result()
+        self.__checkRemoteControl()
+
+    def __checkRemoteControl(self):
+        if self.__inRemoteControl:
+            return
         if not self.Dashboard.isInRemoteControl():
             raise Exception(self.Dashboard.getRobotModel() +
                             " is not in remote mode, switch the robot in remote control")
+        self.__inRemoteControl = True
+
+    def getHealth(self):
+        """
+        :return: The health of the Dashboard and of the Primary connections, see Connection.getHealth
+        :rtype: dict
+        """
 
-    def powerOn(self):
+        return {
+            "Dashboard": self.Dashboard.connection.getHealth(),
+            "Primary": self.Primary.connection.getHealth(),
+        }
+
+    def powerOn(self, timeout=None):
+        """
+        Power on the robot arm and release its brakes
+
+        :param timeout: maximum time to wait for the robot to be idle and then running in seconds, forever by default
+        :type timeout: float
+        """
+
+        deadline = None if timeout is None else time.monotonic() + timeout
+        self.__checkRemoteControl()
         self.Dashboard.powerOnRobotArm()
-        while self.Dashboard.getRobotMode() != RobotMode.IDLE:
-            self.Dashboard.getRobotMode()
+        if not self.waitForRobotMode(RobotMode.IDLE, self.__remaining(deadline)):
+            raise TimeoutError(self.ipAddress + " did not reach IDLE within " + str(timeout) + " s")
         self.Dashboard.brakeRelease()
-        while self.Dashboard.getRobotMode() != RobotMode.RUNNING:
-            self.Dashboard.getRobotMode()
+        if not self.waitForRobotMode(RobotMode.RUNNING, self.__remaining(deadline)):
+            raise TimeoutError(self.ipAddress + " did not reach RUNNING within " + str(timeout) + " s")
+
+    def waitForRobotMode(self, target, timeout=None):
+        """
+        Wait until the robot reaches a mode.
+        The robotMode pushed by the Primary Client is used when its background reader is started,
+        otherwise the dashboard server is polled with an interval backing off up to maxPollInterval.
+
+        :param target: the awaited robot mode
+        :type target: RobotMode
+        :param timeout: maximum time to wait in seconds, forever by default
+        :type timeout: float
+
+        :return: True if the robot mode has been reached, False if the timeout expired
+        :rtype: boolean
+        """
+
+        if self.Primary.isReading():
+            robotMode = RobotModes['ROBOT_MODE_' + target.name].value
+            return self.Primary.waitForState(
+                lambda state: state.robotModeData is not None and state.robotModeData.robotMode == robotMode,
+                timeout) is not None
+        return self.__poll(lambda: self.Dashboard.getRobotMode() == target, timeout)
 
     def powerOff(self):
+        self.__checkRemoteControl()
         self.Dashboard.powerOffRobotArm()
 
-    def runProgram(self, programName):
-        self.Dashboard.load(programName)
-        if self.Dashboard.getRobotMode() != RobotMode.RUNNING:
-            self.powerOn()
-        self.Dashboard.play()
-        while not self.Dashboard.isRunning():
-            pass
-        while self.Dashboard.isRunning():
-            pass
+    def loadProgram(self, programName, loadedProgram=None):
+        """
+        Load a program unless it is already the loaded one, PolyScope reloading the program and its installation
+        takes seconds. The full path reported by the dashboard server is compared with the path this robot loaded
+        the program from, or with the program in PROGRAMS_DIRECTORY, so a program loaded from the teach pendant or by
+        another client is detected, even with the same name in another directory.
+
+        :param programName: name of the .urp program (without the .urp)
+        :type programName: string
+        :param loadedProgram: path of the loaded program when already enquired, enquired otherwise
+        :type loadedProgram: string
+
+        :return: True if the program has been loaded, False if it was already loaded, RuntimeError is raised if the load failed
+        :rtype: boolean
+        """
+
+        if loadedProgram is None:
+            loadedProgram = self.Dashboard.getLoadedProgram()
+        if loadedProgram.strip() == self.__programPath(programName):
+            self.__rememberLoadedProgram(programName, loadedProgram.strip())
+            return False
+
+        self.loadedProgram = None
+        reply = self.Dashboard.load(programName)
+        if not reply.startswith("Loading program"):
+            raise RuntimeError(programName + " could not be loaded: " + reply)
+        self.__rememberLoadedProgram(programName, reply.partition(":")[2].strip() or None)
+        return True
+
+    def __programPath(self, programName):
+        if self.getLoadedProgram() == programName and self.__loadedPath is not None:
+            return self.__loadedPath
+        if programName.startswith("/"):
+            return programName + ".urp"
+        return PROGRAMS_DIRECTORY + programName + ".urp"
+
+    def getLoadedProgram(self):
+        """
+        :return: The program loaded by this robot, None if unknown or if the connection has been restored since then
+        :rtype: string
+        """
+
+        if self.__loadedConnection != self.Dashboard.connection.connections:
+            self.loadedProgram = None
+        return self.loadedProgram
+
+    def __rememberLoadedProgram(self, programName, path):
+        self.loadedProgram = programName
+        self.__loadedPath = path
+        self.__loadedConnection = self.Dashboard.connection.connections
+
+    def runProgram(self, programName, timeout=None):
+        """
+        Load a program if needed, power on the robot if needed, then play the program and wait until it is finished
+
+        :param programName: name of the .urp program (without the .urp)
+        :type programName: string
+        :param timeout: maximum time to wait for the robot to power on and for the program to start and to finish in seconds, forever by default
+        :type timeout: float
+        """
+
+        deadline = None if timeout is None else time.monotonic() + timeout
+        phase = self.__phase
+        phase(None)
+        self.__checkRemoteControl()
+        status = self.Dashboard.getStatus()
+        phase("status")
+        self.loadProgram(programName, status["loadedProgram"])
+        phase("load")
+        if status["robotMode"] != RobotMode.RUNNING:
+            self.powerOn(self.__remaining(deadline))
+            phase("powerOn")
+        reply = self.Dashboard.play()
+        if not reply.startswith("Starting program"):
+            raise RuntimeError(programName + " did not start: " + reply)
+        phase("play")
+        if self.Primary.isReading():
+            self.__waitForProgramRun(programName, self.Primary.getSnapshot()[0], deadline, timeout)
+            return
+        self.__pollProgramRun(programName, deadline, timeout)
+
+    def __waitForProgramRun(self, programName, sequence, deadline, timeout):
+        """
+        Wait for the end of a program played once the state numbered sequence was decoded, from the states pushed by
+        the Primary Client. A program shorter than the period of the states is never seen running: when none of the
+        next PROGRAM_START_STATES states is running, the dashboard server is enquired once, and the program is
+        finished if it is not running anymore.
+        """
+        primary = self.Primary
+        state = primary.waitForState(
+            lambda state: isProgramRunning(state) or primary.getSnapshot()[0] >= sequence + PROGRAM_START_STATES,
+            self.__remaining(deadline))
+        if state is None:
+            raise TimeoutError(programName + " did not start within " + str(timeout) + " s")
+        sequence = primary.getSnapshot()[0]
+        self.__phase("start")
+        if isProgramRunning(state) or self.Dashboard.isRunning():
+            if primary.waitForState(lambda state: not isProgramRunning(state) and primary.getSnapshot()[0] > sequence,
+                                    self.__remaining(deadline)) is None:
+                raise TimeoutError(programName + " did not finish within " + str(timeout) + " s")
+        self.__phase("finish")
+
+    def __pollProgramRun(self, programName, deadline, timeout):
+        """
+        Wait for the end of a program just played by polling the dashboard server. A program shorter than the poll
+        interval is never seen playing: when PROGRAM_START_STATES consecutive polls report the program STOPPED,
+        the program is finished.
+        """
+        stopped = []
+
+        def started():
+            if self.Dashboard.getProgramState().startswith("STOPPED"):
+                stopped.append(True)
+                return len(stopped) >= PROGRAM_START_STATES
+            return True
+
+        if not self.__poll(started, self.__remaining(deadline)):
+            raise TimeoutError(programName + " did not start within " + str(timeout) + " s")
+        self.__phase("start")
+        if len(stopped) < PROGRAM_START_STATES and not self.waitForProgram(False, self.__remaining(deadline)):
+            raise TimeoutError(programName + " did not finish within " + str(timeout) + " s")
+        self.__phase("finish")
+
+    def __phase(self, name):
+        """
+        Measure the time since the previous phase of runProgram, a phase named None only starts the clock
+        """
+        if self.metrics is None:
+            return
+        now = time.perf_counter()
+        if name is not None:
+            self.metrics(RUN_PROGRAM_PHASE, name, now - self.__phaseStart)
+        self.__phaseStart = now
+
+    def waitForProgram(self, running, timeout=None):
+        """
+        Wait until a program is running or is not running anymore.
+        The isProgramRunning flag pushed by the Primary Client is used when its background reader is started,
+        otherwise the dashboard server is polled with an interval backing off up to maxPollInterval.
+
+        :param running: the awaited running state
+        :type running: boolean
+        :param timeout: maximum time to wait in seconds, forever by default
+        :type timeout: float
+
+        :return: True if the running state has been reached, False if the timeout expired
+        :rtype: boolean
+        """
+
+        if self.Primary.isReading():
+            return self.Primary.waitForState(
+                lambda state: state.robotModeData is not None and state.robotModeData.isProgramRunning == running,
+                timeout) is not None
+        return self.__poll(lambda: self.Dashboard.isRunning() == running, timeout)
+
+    def __poll(self, condition, timeout):
+        deadline = None if timeout is None else time.monotonic() + timeout
+        interval = self.pollInterval
+        while not condition():
+            remaining = self.__remaining(deadline)
+            if remaining == 0:
+                return False
+            time.sleep(interval if remaining is None else min(interval, remaining))
+            interval = min(2 * interval, self.maxPollInterval)
+        return True
+
+    @staticmethod
+    def __remaining(deadline):
+        if deadline is None:
+            return None
+        return max(0.0, deadline - time.monotonic())
+
+
+def isProgramRunning(state):
+    """
+    :param state: a state decoded by the Primary Client
+    :type state: RobotState
+
+    :return: True if the state reports a running program
+    :rtype: boolean
+    """
+
+    return state.robotModeData is not None and state.robotModeData.isProgramRunning
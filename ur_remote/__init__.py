@@ -1,3 +1,19 @@
 from ur_remote.URRobot import URRobot
 from ur_remote.Dashboard import Dashboard
 from ur_remote.Primary import Primary
+from ur_remote.PrimaryState import RobotState
+from ur_remote.MotionHistory import MotionHistory
+from ur_remote.AsyncURRobot import AsyncURRobot
+from ur_remote.AsyncDashboard import AsyncDashboard
+from ur_remote.AsyncPrimary import AsyncPrimary
+from ur_remote.Fleet import Fleet
+from ur_remote.Connection import SocketOptions
+from ur_remote.PrimaryRecorder import PrimaryRecorder
+from ur_remote.PrimaryRecorder import PrimaryReplay
+from ur_remote.StateHistory import StateHistory
+from ur_remote.Simulator import SimulatedController
+from ur_remote.Metrics import MetricsCollector
+from ur_remote.ChangeTracker import ChangeTracker
+from ur_remote.SharedState import SharedStatePublisher
+from ur_remote.SharedState import SharedStateReader
+from ur_remote.Reactor import Reactor